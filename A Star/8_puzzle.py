@@ -1,76 +1,247 @@
 import heapq
-import copy
+import mmap
+import os
+from collections import deque
+from itertools import product
+from math import factorial
 
 N=3
 row=[1,0,-1,0]
 col=[0,-1,0,1]
+MOVE_NAMES = ['D', 'L', 'U', 'R'] # direction the blank moves in
 
-def misplaced_tiles(state, goal):
-    return sum(state[i][j] != 0 and state[i][j] != goal[i][j] for i in range(N) for j in range(N))
+# A state is one int with 4 bits per cell: cell i = (state >> 4*i) & 0xF, cells in row-major order.
 
-def isSafe(x,y):
-    return 0<=x<N and 0<=y<N
-
-def matrix_to_tuple(mat):
-    return tuple(tuple(row) for row in mat)
+def pack(mat):
+    state = 0
+    for i, tile in enumerate(t for r in mat for t in r):
+        state |= tile << (4 * i)
+    return state
 
+def unpack(state):
+    return [[(state >> (4 * (i * N + j))) & 0xF for j in range(N)] for i in range(N)]
 
-def solve(initial, goal):
+def isSafe(x,y):
+    return 0<=x<N and 0<=y<N
 
-    def find_zero(mat):
+def neighbours(state, blank):
+    # (new state, new blank cell, tile that moved, move name) for every legal blank move
+    x, y = divmod(blank, N)
+    for i in range(4):
+        nx, ny = x+row[i], y+col[i]
+        if isSafe(nx, ny):
+            src = nx * N + ny
+            tile = (state >> (4 * src)) & 0xF
+            # the tile at src moves into the blank cell
+            yield state ^ (tile << (4 * src)) ^ (tile << (4 * blank)), src, tile, MOVE_NAMES[i]
+
+def is_solvable(initial, goal):
+    # the blank moves keep (inversions + blank row) parity for even N, inversions parity for odd N
+    def parity(mat):
+        tiles = [t for r in mat for t in r if t != 0]
+        inversions = sum(a > b for i, a in enumerate(tiles) for b in tiles[i + 1:])
+        blank_row = next(i for i in range(N) for j in range(N) if mat[i][j] == 0)
+        return (inversions + (blank_row if N % 2 == 0 else 0)) % 2
+    return parity(initial) == parity(goal)
+
+class Heuristic:
+    # Manhattan distance plus linear conflict, both measured against one goal.
+    # Linear conflict for every possible content of a row or column is precomputed, so a move
+    # only looks up the two lines it touches.
+    def __init__(self, goal):
+        self.goal_pos = {}
         for i in range(N):
             for j in range(N):
-                if(mat[i][j] == 0):
-                    return i, j
-                
-    x, y = find_zero(initial)
-    pq=[]
-    visited = set()
-
-    heapq.heappush(pq, (misplaced_tiles(initial, goal), 0, initial, x, y))
-    visited.add(matrix_to_tuple(initial))
-
+                self.goal_pos[goal[i][j]] = (i, j)
+        # manhattan[tile][cell]
+        self.manhattan = [[0] * (N * N) for _ in range(16)]
+        for tile, (gi, gj) in self.goal_pos.items():
+            if tile:
+                for cell in range(N * N):
+                    self.manhattan[tile][cell] = abs(cell // N - gi) + abs(cell % N - gj)
+        self.row_conflicts = [self.line_table(r, 0) for r in range(N)]
+        self.col_conflicts = [self.line_table(c, 1) for c in range(N)]
+
+    def line_table(self, line, axis):
+        # conflicts for every combination of N tiles (4 bits each) placed on this line
+        table = [0] * (1 << (4 * N))
+        for tiles in product(range(16), repeat=N):
+            own = [(pos, self.goal_pos[t][1 - axis]) for pos, t in enumerate(tiles)
+                   if t in self.goal_pos and t != 0 and self.goal_pos[t][axis] == line]
+            table[sum(t << (4 * k) for k, t in enumerate(tiles))] = 2 * self.min_removals(own)
+        return table
+
+    def min_removals(self, tiles):
+        # tiles: (position, goal position) pairs on one line; remove the fewest so the rest are in order
+        goals = [g for _, g in sorted(tiles)]
+        longest = [1] * len(goals)
+        for i in range(len(goals)):
+            for j in range(i):
+                if goals[j] < goals[i]:
+                    longest[i] = max(longest[i], longest[j] + 1)
+        return len(goals) - max(longest, default=0)
+
+    def row_value(self, state, r):
+        return (state >> (4 * N * r)) & ((1 << (4 * N)) - 1)
+
+    def col_value(self, state, c):
+        value = 0
+        for r in range(N):
+            value |= ((state >> (4 * (r * N + c))) & 0xF) << (4 * r)
+        return value
+
+    def line_conflicts(self, state, r, c):
+        return self.row_conflicts[r][self.row_value(state, r)] + self.col_conflicts[c][self.col_value(state, c)]
+
+    def full(self, state):
+        h = 0
+        for cell in range(N * N):
+            h += self.manhattan[(state >> (4 * cell)) & 0xF][cell]
+        for r in range(N):
+            h += self.row_conflicts[r][self.row_value(state, r)]
+        for c in range(N):
+            h += self.col_conflicts[c][self.col_value(state, c)]
+        return h
+
+    def after_move(self, h, state, new_state, tile, src, dst):
+        # tile slides from cell src to cell dst; only its lines' conflicts can change
+        h += self.manhattan[tile][dst] - self.manhattan[tile][src]
+        if src // N == dst // N: # horizontal move changes two columns
+            lines = [(self.col_conflicts[src % N], self.col_value, src % N), (self.col_conflicts[dst % N], self.col_value, dst % N)]
+        else:
+            lines = [(self.row_conflicts[src // N], self.row_value, src // N), (self.row_conflicts[dst // N], self.row_value, dst // N)]
+        for table, value, line in lines:
+            h += table[value(new_state, line)] - table[value(state, line)]
+        return h
+
+def solve(initial, goal, verbose=False):
+    # A* over packed states; returns the list of blank moves, or None if there is no solution
+    if not is_solvable(initial, goal):
+        if verbose:
+            print("Unsolvable")
+        return None
+
+    heuristic = Heuristic(goal)
+    start, target = pack(initial), pack(goal)
+    blank = next(i * N + j for i in range(N) for j in range(N) if initial[i][j] == 0)
+    h = heuristic.full(start)
+
+    pq = [(h, 0, start, blank, h)]
+    best_g = {start: 0}
+    parent = {start: None}
     k = 1
     while pq:
-
-        f,g,mat,x,y = heapq.heappop(pq)
-
-        print(f"Step {k}: g = {g}  h = {f-g} f={f}")
-        for row_mat in mat:
-            print(row_mat)
-        print()
+        f, g, state, blank, h = heapq.heappop(pq)
+        if best_g[state] < g:
+            continue # stale entry
+        if verbose:
+            print(f"Step {k}: g = {g}  h = {h} f={f}")
+            for row_mat in unpack(state):
+                print(row_mat)
+            print()
         k += 1
-        if misplaced_tiles(mat, goal) == 0:
-            print("Goal Reached !")
-            return
-
-
-        for i in range(4):
-
-            nx, ny = x+row[i], y+col[i]
-
-            if(isSafe(nx, ny)):
-
-                new_mat = copy.deepcopy(mat)
-                new_mat[x][y], new_mat[nx][ny] = new_mat[nx][ny], new_mat[x][y]
-                new_mat_tuple = matrix_to_tuple(new_mat)
-
-                if new_mat_tuple not in visited:
-                    visited.add(new_mat_tuple)
-                    h = misplaced_tiles(new_mat, goal)
-                    heapq.heappush(pq, (g+1+h, g+1, new_mat, nx, ny))
-
-
-initial = [
-    [1, 2, 3],
-    [4, 5, 6],
-    [0, 7, 8]
-]
-
-goal = [
-    [1,2,3],
-    [4,5,6],
-    [7,8,0]
-]
-
-solve(initial, goal)
\ No newline at end of file
+        if state == target:
+            if verbose:
+                print("Goal Reached !")
+            moves = []
+            while parent[state] is not None:
+                state, move = parent[state]
+                moves.append(move)
+            return moves[::-1]
+
+        for new_state, src, tile, move in neighbours(state, blank):
+            if best_g.get(new_state, g + 2) > g + 1:
+                best_g[new_state] = g + 1
+                parent[new_state] = (state, move)
+                new_h = heuristic.after_move(h, state, new_state, tile, src, blank)
+                heapq.heappush(pq, (g + 1 + new_h, g + 1, new_state, src, new_h))
+    return None
+
+# Exact distance table: one BFS backwards from the goal over all 9!/2 reachable states.
+# A state is indexed by its blank cell and the Lehmer code rank of its 8 tiles in reading order.
+# For odd N the tile inversion parity never changes (see is_solvable), and swapping the last two
+# tiles flips it while changing the rank by exactly one, so ranks 2k and 2k+1 hold one reachable
+# arrangement each and rank // 2 is enough. The table, one byte per state, is saved next to
+# this file and memory-mapped on load.
+UNVISITED = 255
+TILES = N * N - 1
+HALF_PERMUTATIONS = factorial(TILES) // 2
+TABLE_SIZE = N * N * HALF_PERMUTATIONS
+HALF_FACTORIALS = [factorial(i) // 2 for i in range(TILES)]
+
+def table_index(state):
+    # the last two tiles only decide the parity bit, so they add nothing to rank // 2
+    tiles = []
+    blank = 0
+    for cell in range(N * N):
+        tile = (state >> (4 * cell)) & 0xF
+        if tile:
+            tiles.append(tile)
+        else:
+            blank = cell
+    r = 0
+    for i in range(TILES - 2):
+        smaller = sum(other < tiles[i] for other in tiles[i + 1:])
+        r += smaller * HALF_FACTORIALS[TILES - 1 - i]
+    return blank * HALF_PERMUTATIONS + r
+
+def build_distance_table(goal):
+    table = bytearray([UNVISITED]) * TABLE_SIZE
+    start = pack(goal)
+    blank = next(i * N + j for i in range(N) for j in range(N) if goal[i][j] == 0)
+    table[table_index(start)] = 0
+    queue = deque([(start, blank, 0)])
+    while queue:
+        state, blank, d = queue.popleft()
+        for new_state, new_blank, _, _ in neighbours(state, blank):
+            r = table_index(new_state)
+            if table[r] == UNVISITED:
+                table[r] = d + 1
+                queue.append((new_state, new_blank, d + 1))
+    return table
+
+def table_path(goal):
+    name = ''.join(str(t) for r in goal for t in r)
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), f'8_puzzle_{name}.bin')
+
+def load_table(goal, path=None):
+    path = path or table_path(goal)
+    # tables from before the halved layout are full 9! size, rebuild those too
+    if not os.path.exists(path) or os.path.getsize(path) != TABLE_SIZE:
+        with open(path + '.tmp', 'wb') as f:
+            f.write(build_distance_table(goal))
+        os.replace(path + '.tmp', path)
+    with open(path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def solve_with_table(initial, goal, table=None):
+    # no search: from every state some neighbour is exactly one step closer to the goal
+    if not is_solvable(initial, goal):
+        return None
+    table = table if table is not None else load_table(goal)
+    state = pack(initial)
+    blank = next(i * N + j for i in range(N) for j in range(N) if initial[i][j] == 0)
+    moves = []
+    d = table[table_index(state)]
+    while d:
+        for new_state, new_blank, _, move in neighbours(state, blank):
+            if table[table_index(new_state)] == d - 1:
+                state, blank, d = new_state, new_blank, d - 1
+                moves.append(move)
+                break
+    return moves
+
+if __name__ == '__main__':
+    initial = [
+        [1, 2, 3],
+        [4, 5, 6],
+        [0, 7, 8]
+    ]
+
+    goal = [
+        [1,2,3],
+        [4,5,6],
+        [7,8,0]
+    ]
+
+    print(solve(initial, goal, verbose=True))
@@ -0,0 +1,134 @@
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass
+from math import isqrt
+
+from sliding_puzzle import Solver, is_solvable
+from streaming import map_ordered
+
+# Solve many sliding puzzles at once.
+#
+# An instance file has one board per line, tiles separated by spaces or commas, 0 for the blank
+# and the width taken from the number of tiles (9 -> 3x3, 16 -> 4x4). Blank lines and lines
+# starting with # are skipped. Unsolvable boards are dropped by the parity check before any
+# search. The rest go to a process pool, one board per task with a bounded number in flight,
+# and results come back in input order as one JSON object per line.
+# Pattern databases are built once in the parent; every worker memory-maps the same files, so
+# the tables sit in the page cache only once no matter how many workers there are.
+# The pool loop comes from streaming.py at the repository root, so run this with the root on
+# PYTHONPATH (PYTHONPATH=. python "A Star/puzzle_batch.py").
+
+# benchmark corpus: fixed boards, goal 1..N*N-1 with the blank last (optimal length in the comment)
+CORPUS = {
+    'easy': [
+        [1, 4, 5, 8, 6, 3, 0, 7, 2],  # 24
+        [7, 3, 2, 5, 8, 1, 4, 6, 0],  # 20
+        [5, 0, 3, 8, 1, 7, 2, 4, 6],  # 17
+        [0, 5, 8, 6, 1, 7, 4, 3, 2],  # 22
+    ],
+    'medium': [
+        [0, 3, 4, 15, 12, 2, 13, 11, 6, 5, 14, 7, 1, 10, 9, 8],  # 48
+        [10, 5, 2, 1, 9, 8, 15, 3, 13, 6, 4, 7, 11, 0, 14, 12],  # 38
+        [13, 1, 3, 7, 10, 4, 6, 8, 15, 2, 9, 11, 12, 14, 5, 0],  # 44
+        [0, 13, 3, 1, 7, 2, 5, 6, 15, 14, 12, 4, 8, 11, 10, 9],  # 52
+    ],
+    'hard': [
+        [11, 13, 0, 14, 6, 8, 3, 1, 5, 12, 15, 2, 9, 10, 4, 7],  # 52
+        [4, 7, 2, 10, 14, 15, 8, 9, 3, 6, 1, 12, 0, 5, 11, 13],  # 53
+        [4, 2, 14, 7, 15, 0, 6, 5, 3, 8, 1, 13, 12, 10, 9, 11],  # 56
+        [5, 8, 15, 9, 4, 10, 3, 2, 14, 7, 6, 13, 0, 11, 1, 12],  # 57
+    ],
+}
+
+@dataclass
+class TierReport:
+    name: str
+    instances: int
+    nodes: int
+    seconds: float
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.seconds if self.seconds else float('inf')
+
+    def __str__(self):
+        return (f"{self.name:<8} {self.instances} boards, {self.nodes:,} nodes in {self.seconds:.2f} s "
+                f"({self.nodes_per_second:,.0f} nodes/s)")
+
+def width_of(board):
+    n = isqrt(len(board))
+    if n * n != len(board) or sorted(board) != list(range(n * n)):
+        raise ValueError(f"Not a sliding puzzle board: {board}")
+    return n
+
+def read_instances(lines):
+    # yields (line number, board)
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        yield number, [int(t) for t in line.replace(',', ' ').split()]
+
+_worker_solvers = None
+
+def _init_worker(directory):
+    global _worker_solvers
+    _worker_solvers = {'directory': directory}
+
+def get_solver(n):
+    # one solver per width, the databases are opened the first time a width shows up
+    if n not in _worker_solvers:
+        _worker_solvers[n] = Solver(n, directory=_worker_solvers['directory'])
+    return _worker_solvers[n]
+
+def _solve_task(item):
+    key, board, solvable = item
+    if not solvable:
+        return key, board, None
+    solver = get_solver(width_of(board))
+    start = time.perf_counter()
+    moves = solver.solve(board)
+    return key, board, {'moves': ''.join(moves), 'length': len(moves), 'nodes': solver.nodes,
+                        'seconds': round(time.perf_counter() - start, 6)}
+
+def solve_batch(instances, workers=None, directory=None):
+    # instances: (id, board) pairs; yields (id, board, result) in input order, result is None
+    # for boards that can't be solved
+    _init_worker(directory)
+
+    def tasks():
+        for key, board in instances:
+            n = width_of(board)
+            solvable = is_solvable(board, n)
+            if solvable:
+                get_solver(n) # builds missing tables here, before any worker opens them
+            yield key, board, solvable
+
+    yield from map_ordered(_solve_task, tasks(), workers, _init_worker, (directory,))
+
+def solve_file(in_path, out, workers=None, directory=None):
+    with open(in_path) as src:
+        for number, board, result in solve_batch(read_instances(src), workers, directory):
+            record = {'line': number, 'board': board, 'solvable': result is not None}
+            record.update(result or {})
+            out.write(json.dumps(record) + '\n')
+            out.flush()
+
+def benchmark(workers=None, directory=None, corpus=CORPUS):
+    reports = []
+    for name, boards in corpus.items():
+        start = time.perf_counter()
+        nodes = sum(result['nodes'] for _, _, result in solve_batch(enumerate(boards), workers, directory))
+        reports.append(TierReport(name, len(boards), nodes, time.perf_counter() - start))
+    return reports
+
+if __name__ == '__main__':
+    in_path = input('Instance file (empty to run the benchmark): ')
+    workers = int(input('Process pool workers: ') or os.cpu_count())
+    if in_path:
+        solve_file(in_path, sys.stdout, workers)
+    else:
+        for report in benchmark(workers):
+            print(report)
@@ -1,7 +1,7 @@
 import heapq
 import numpy as np
 from dataclasses import dataclass
-from typing import List, Tuple, Set, Dict
+from typing import List, Tuple, Set, Dict, Optional
 
 @dataclass
 class Object:
@@ -21,24 +21,92 @@ class PlacedObject:
     pos: Position
     rotation: bool  # True if rotated 90 degrees
 
-@dataclass
+class OccupancyIndex:
+    # Summed-area table of the occupied grid: sat[y, x] is the number of occupied cells above
+    # and left of (x, y), so any rectangle's count is four lookups.
+    def __init__(self, grid: np.ndarray):
+        height, width = grid.shape
+        self.sat = np.zeros((height + 1, width + 1), dtype=np.int32)
+        self.sat[1:, 1:] = grid.cumsum(axis=0).cumsum(axis=1)
+
+    def count(self, x: int, y: int, width: int, height: int) -> int:
+        s = self.sat
+        return int(s[y + height, x + width] - s[y, x + width] - s[y + height, x] + s[y, x])
+
+    def is_free(self, x: int, y: int, width: int, height: int) -> bool:
+        return self.count(x, y, width, height) == 0
+
+    def free_mask(self, width: int, height: int) -> np.ndarray:
+        # mask[y, x] is True when a width x height rectangle with top-left (x, y) is empty
+        s = self.sat
+        if height >= s.shape[0] or width >= s.shape[1]:
+            return np.zeros((0, 0), dtype=bool)
+        counts = s[height:, width:] - s[:-height, width:] - s[height:, :-width] + s[:-height, :-width]
+        return counts == 0
+
+def count_isolated_cells(grid: np.ndarray) -> int:
+    # An empty cell is isolated when none of its four neighbours is empty. Shifting the
+    # empty mask one step in each direction (with occupied padding at the walls) gives
+    # every cell's neighbours at once.
+    empty = np.pad(grid == 0, 1, constant_values=False)
+    inner = empty[1:-1, 1:-1]
+    has_empty_neighbor = empty[:-2, 1:-1] | empty[2:, 1:-1] | empty[1:-1, :-2] | empty[1:-1, 2:]
+    return int(np.count_nonzero(inner & ~has_empty_neighbor))
+
 class State:
-    room_width: int
-    room_height: int
-    placed_objects: List[PlacedObject]
-    remaining_objects: List[Object]
-    occupied_grid: np.ndarray
+    # One search node, a few dozen bytes: occupancy is an int bitboard (bit y * room_width + x),
+    # placements are recovered through parent pointers and the objects still to place are
+    # objects[depth:], a list shared by every state of the search. The occupied area and the
+    # isolated cell count are carried forward on each placement and the heuristic is cached.
+    __slots__ = ('room_width', 'room_height', 'objects', 'depth', 'occupied', 'parent', 'placed',
+                 'area', 'isolated', 'score')
+
+    def __init__(self, room_width: int, room_height: int, objects: List[Object], depth: int = 0,
+                 occupied: int = 0, parent: Optional['State'] = None, placed: Optional[PlacedObject] = None,
+                 area: int = 0, isolated: int = 0):
+        self.room_width = room_width
+        self.room_height = room_height
+        self.objects = objects
+        self.depth = depth
+        self.occupied = occupied
+        self.parent = parent
+        self.placed = placed
+        self.area = area
+        self.isolated = isolated
+        self.score = None
+
+    def place(self, placed: PlacedObject, mask: int, area: int, isolated: int) -> 'State':
+        return State(self.room_width, self.room_height, self.objects, self.depth + 1,
+                     self.occupied | mask, self, placed, self.area + area, isolated)
+
+    @property
+    def placed_objects(self) -> List[PlacedObject]:
+        placed = []
+        state = self
+        while state.placed is not None:
+            placed.append(state.placed)
+            state = state.parent
+        return placed[::-1]
+
+    @property
+    def remaining_objects(self) -> List[Object]:
+        return self.objects[self.depth:]
+
+    @property
+    def occupied_grid(self) -> np.ndarray:
+        cells = self.room_width * self.room_height
+        data = np.frombuffer(self.occupied.to_bytes((cells + 7) // 8, 'little'), dtype=np.uint8)
+        bits = np.unpackbits(data, bitorder='little')[:cells]
+        return bits.reshape(self.room_height, self.room_width).astype(int)
+
+    def get_index(self) -> OccupancyIndex:
+        return OccupancyIndex(self.occupied_grid)
     
     def is_goal(self) -> bool:
-        return len(self.remaining_objects) == 0
+        return self.depth == len(self.objects)
     
     def get_occupied_area(self) -> int:
-        occupied = 0
-        for placed in self.placed_objects:
-            width = placed.obj.height if placed.rotation else placed.obj.width
-            height = placed.obj.width if placed.rotation else placed.obj.height
-            occupied += width * height
-        return occupied
+        return self.area
     
     def get_empty_area(self) -> int:
         return self.room_width * self.room_height - self.get_occupied_area()
@@ -46,13 +114,18 @@ class State:
     def compute_utilization(self) -> float:
         return self.get_occupied_area() / (self.room_width * self.room_height)
     
-    def get_state_hash(self) -> str:
-        return str(self.occupied_grid.tobytes())
+    def get_state_hash(self) -> int:
+        # the bitboard is the grid, so it is an exact key on its own
+        return self.occupied
 
 class RoomArrangement:
     def __init__(self, room_width: int, room_height: int):
         self.room_width = room_width
         self.room_height = room_height
+        # column_masks[h] has bit 0 of h consecutive rows set, a rectangle is a row mask times that
+        self.column_masks = [0]
+        for _ in range(room_height):
+            self.column_masks.append((self.column_masks[-1] << room_width) | 1)
     
     def can_place_object(self, state: State, obj: Object, pos: Position, rotated: bool) -> bool:
         width = obj.height if rotated else obj.width
@@ -63,26 +136,14 @@ class RoomArrangement:
             return False
         
         # Check if object overlaps with any placed objects
-        for x in range(pos.x, pos.x + width):
-            for y in range(pos.y, pos.y + height):
-                if state.occupied_grid[y, x] == 1:
-                    return False
-        
-        return True
+        return state.occupied & self.rect_mask(pos.x, pos.y, width, height) == 0
     
-    def update_grid(self, grid: np.ndarray, obj: Object, pos: Position, rotated: bool, value: int = 1) -> np.ndarray:
-        width = obj.height if rotated else obj.width
-        height = obj.width if rotated else obj.height
-        
-        new_grid = grid.copy()
-        for x in range(pos.x, pos.x + width):
-            for y in range(pos.y, pos.y + height):
-                new_grid[y, x] = value
-        
-        return new_grid
+    def rect_mask(self, x: int, y: int, width: int, height: int) -> int:
+        return (((1 << width) - 1) * self.column_masks[height]) << (y * self.room_width + x)
     
     def get_valid_positions(self, state: State, obj: Object) -> List[Tuple[Position, bool]]:
         valid_positions = []
+        index = state.get_index()
         
         # Try placing the object with and without rotation
         for rotated in [False, True]:
@@ -93,44 +154,51 @@ class RoomArrangement:
             width = obj.height if rotated else obj.width
             height = obj.width if rotated else obj.height
             
-            for x in range(state.room_width - width + 1):
-                for y in range(state.room_height - height + 1):
-                    pos = Position(x, y)
-                    if self.can_place_object(state, obj, pos, rotated):
-                        valid_positions.append((pos, rotated))
+            # every free top-left corner at once, in x then y order
+            mask = index.free_mask(width, height)
+            for x, y in np.argwhere(mask.T):
+                valid_positions.append((Position(int(x), int(y)), rotated))
         
         return valid_positions
     
     def heuristic(self, state: State) -> float:
-        # Heuristic: estimate quality of placement
-        # 1. Space utilization (higher is better)
-        utilization = state.compute_utilization()
-        
-        # 2. Penalty for fragmentation (lower is better)
-        fragmentation = self.calculate_fragmentation(state)
-        
-        # Combined score (we want to maximize utilization and minimize fragmentation)
-        # We return negative because A* minimizes cost
-        return -1 * (utilization - 0.3 * fragmentation)
+        # computed once per state, successors and the open set reuse it
+        if state.score is None:
+            cells = state.room_width * state.room_height
+            # 1. Space utilization (higher is better)
+            utilization = state.area / cells
+            
+            # 2. Penalty for fragmentation (lower is better)
+            fragmentation = state.isolated / cells
+            
+            # Combined score (we want to maximize utilization and minimize fragmentation)
+            # We return negative because A* minimizes cost
+            state.score = -1 * (utilization - 0.3 * fragmentation)
+        return state.score
     
     def calculate_fragmentation(self, state: State) -> float:
-        # Count number of isolated empty cells
-        empty_cells = 0
-        for y in range(state.room_height):
-            for x in range(state.room_width):
-                if state.occupied_grid[y, x] == 0:
-                    empty_neighbors = 0
-                    # Check four adjacent cells
-                    for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-                        nx, ny = x + dx, y + dy
-                        if 0 <= nx < state.room_width and 0 <= ny < state.room_height and state.occupied_grid[ny, nx] == 0:
-                            empty_neighbors += 1
-                    
-                    # If cell has no empty neighbors, it's isolated
-                    if empty_neighbors == 0:
-                        empty_cells += 1
-        
-        return empty_cells / (state.room_width * state.room_height)
+        # Fraction of isolated empty cells, recounted from the full grid
+        return count_isolated_cells(state.occupied_grid) / (state.room_width * state.room_height)
+    
+    def is_empty(self, occupied: int, x: int, y: int) -> bool:
+        return 0 <= x < self.room_width and 0 <= y < self.room_height and not occupied >> (y * self.room_width + x) & 1
+    
+    def is_isolated(self, occupied: int, x: int, y: int) -> bool:
+        return (self.is_empty(occupied, x, y) and not self.is_empty(occupied, x + 1, y)
+                and not self.is_empty(occupied, x - 1, y) and not self.is_empty(occupied, x, y + 1)
+                and not self.is_empty(occupied, x, y - 1))
+    
+    def update_isolated(self, state: State, occupied: int, x: int, y: int, width: int, height: int) -> int:
+        # Placing a rectangle only changes the neighbourhood of the cells on its border. Those
+        # cells all touched an empty rectangle cell before, so any of them isolated now is new.
+        isolated = state.isolated
+        if width == 1 and height == 1 and self.is_isolated(state.occupied, x, y):
+            isolated -= 1
+        for cx in range(x, x + width):
+            isolated += self.is_isolated(occupied, cx, y - 1) + self.is_isolated(occupied, cx, y + height)
+        for cy in range(y, y + height):
+            isolated += self.is_isolated(occupied, x - 1, cy) + self.is_isolated(occupied, x + width, cy)
+        return isolated
     
     def get_successors(self, state: State) -> List[Tuple[State, float]]:
         successors = []
@@ -144,14 +212,11 @@ class RoomArrangement:
         
         for pos, rotated in valid_positions:
             # Create new state with the object placed
-            new_occupied_grid = self.update_grid(state.occupied_grid, next_obj, pos, rotated)
-            new_state = State(
-                room_width=state.room_width,
-                room_height=state.room_height,
-                placed_objects=state.placed_objects + [PlacedObject(next_obj, pos, rotated)],
-                remaining_objects=state.remaining_objects[1:],
-                occupied_grid=new_occupied_grid
-            )
+            width = next_obj.height if rotated else next_obj.width
+            height = next_obj.width if rotated else next_obj.height
+            mask = self.rect_mask(pos.x, pos.y, width, height)
+            isolated = self.update_isolated(state, state.occupied | mask, pos.x, pos.y, width, height)
+            new_state = state.place(PlacedObject(next_obj, pos, rotated), mask, width * height, isolated)
             
             # Calculate cost for this placement
             cost = self.heuristic(new_state)
@@ -164,13 +229,8 @@ class RoomArrangement:
         objects.sort(key=lambda obj: obj.width * obj.height, reverse=True)
         
         # Create initial state
-        initial_state = State(
-            room_width=self.room_width,
-            room_height=self.room_height,
-            placed_objects=[],
-            remaining_objects=objects,
-            occupied_grid=np.zeros((self.room_height, self.room_width), dtype=int)
-        )
+        initial_state = State(self.room_width, self.room_height, objects)
+        initial_state.isolated = count_isolated_cells(initial_state.occupied_grid)
         
         # Priority queue for A* search
         open_set = []
@@ -181,7 +241,6 @@ class RoomArrangement:
         
         # Track best path
         g_score = {initial_state.get_state_hash(): 0}
-        came_from = {}
         tiebreaker = 1
         
         while open_set:
@@ -207,8 +266,7 @@ class RoomArrangement:
                 tentative_g_score = g_score[state_hash] + cost
                 
                 if successor_hash not in g_score or tentative_g_score < g_score[successor_hash]:
-                    # This path is better
-                    came_from[successor_hash] = current_state
+                    # This path is better, the successor already points back at current_state
                     g_score[successor_hash] = tentative_g_score
                     f_score = tentative_g_score + self.heuristic(successor)
                     heapq.heappush(open_set, (f_score, tiebreaker, successor))
@@ -256,38 +314,39 @@ def visualize_placement(room_width, room_height, placed_objects):
             print(f"{grid[y, x]:2}", end=" ")
         print()
 
-# Example usage
-room_width = 20
-room_height = 15
-objects = create_objects()
+if __name__ == '__main__':
+    # Example usage
+    room_width = 20
+    room_height = 15
+    objects = create_objects()
 
-# Print object dimensions
-print("Objects:")
-for obj in objects:
-    obj_type = "Square" if obj.is_square else "Rectangle"
-    print(f"ID: {obj.id}, Type: {obj_type}, Dimensions: {obj.width}x{obj.height}")
+    # Print object dimensions
+    print("Objects:")
+    for obj in objects:
+        obj_type = "Square" if obj.is_square else "Rectangle"
+        print(f"ID: {obj.id}, Type: {obj_type}, Dimensions: {obj.width}x{obj.height}")
 
-room_arrangement = RoomArrangement(room_width, room_height)
-solution = room_arrangement.a_star_search(objects)
+    room_arrangement = RoomArrangement(room_width, room_height)
+    solution = room_arrangement.a_star_search(objects)
 
-if solution:
-    print("\nSolution found!")
-    print(f"Placed {len(solution)} objects")
-    
-    total_area = room_width * room_height
-    occupied_area = sum(
-        (obj.obj.width if not obj.rotation else obj.obj.height) * 
-        (obj.obj.height if not obj.rotation else obj.obj.width) 
-        for obj in solution
-    )
-    utilization = occupied_area / total_area * 100
-    
-    print(f"Room dimensions: {room_width}x{room_height}")
-    print(f"Total room area: {total_area}")
-    print(f"Occupied area: {occupied_area}")
-    print(f"Space utilization: {utilization:.2f}%")
-    
-    print("\nPlacement visualization:")
-    visualize_placement(room_width, room_height, solution)
-else:
-    print("No solution found.")
\ No newline at end of file
+    if solution:
+        print("\nSolution found!")
+        print(f"Placed {len(solution)} objects")
+        
+        total_area = room_width * room_height
+        occupied_area = sum(
+            (obj.obj.width if not obj.rotation else obj.obj.height) * 
+            (obj.obj.height if not obj.rotation else obj.obj.width) 
+            for obj in solution
+        )
+        utilization = occupied_area / total_area * 100
+        
+        print(f"Room dimensions: {room_width}x{room_height}")
+        print(f"Total room area: {total_area}")
+        print(f"Occupied area: {occupied_area}")
+        print(f"Space utilization: {utilization:.2f}%")
+        
+        print("\nPlacement visualization:")
+        visualize_placement(room_width, room_height, solution)
+    else:
+        print("No solution found.")
\ No newline at end of file
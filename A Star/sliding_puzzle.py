@@ -0,0 +1,198 @@
+import mmap
+import os
+import time
+
+import numpy as np
+
+# NxN sliding puzzle (15-puzzle, 24-puzzle, ...) with IDA* and disjoint additive pattern databases.
+#
+# The goal is 1, 2, ..., N*N-1 in row-major order with the blank (0) last. Each pattern database
+# covers a group of tiles and stores, for every placement of those tiles, the fewest moves of
+# *those* tiles needed to reach their goal cells. Groups are disjoint, so the values add up
+# to an admissible heuristic. Tables are built once by breadth-first search, saved as one byte
+# per placement and memory-mapped on later runs. IDA* itself only keeps the current path.
+
+row = [1, 0, -1, 0]
+col = [0, -1, 0, 1]
+MOVE_NAMES = ['D', 'L', 'U', 'R'] # direction the blank moves in
+UNREACHABLE = 255
+
+def default_partition(n):
+    tiles = list(range(1, n * n))
+    size = {3: 4, 4: 5}.get(n, 4)
+    return [tuple(tiles[i:i + size]) for i in range(0, len(tiles), size)]
+
+def is_solvable(board, n):
+    tiles = [t for t in board if t != 0]
+    inversions = sum(a > b for i, a in enumerate(tiles) for b in tiles[i + 1:])
+    if n % 2:
+        return inversions % 2 == 0
+    # even width: blank row counted from the bottom decides the parity
+    blank_row_from_bottom = n - board.index(0) // n
+    return (inversions + blank_row_from_bottom) % 2 == 1
+
+class PatternDatabase:
+    # table index: sum of position(tile_i) * cells^i over the tiles of the group
+    def __init__(self, n, tiles, directory=None):
+        self.n = n
+        self.tiles = tuple(tiles)
+        self.cells = n * n
+        directory = directory or os.path.dirname(os.path.abspath(__file__))
+        self.path = os.path.join(directory, f"pdb_{n}_{'-'.join(map(str, self.tiles))}.bin")
+        if not os.path.exists(self.path):
+            # build first, so an interrupted build leaves no partial file behind
+            table = self.build().tobytes()
+            os.makedirs(directory, exist_ok=True)
+            with open(self.path + '.tmp', 'wb') as f:
+                f.write(table)
+            os.replace(self.path + '.tmp', self.path)
+        with open(self.path, 'rb') as f:
+            self.table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def build(self):
+        # 0-1 BFS backwards from the goal over (blank, tile positions), vectorized one layer at a
+        # time: moving a group tile costs 1, moving any other tile is free.
+        n, cells, k = self.n, self.cells, len(self.tiles)
+        powers = cells ** np.arange(k + 1, dtype=np.int64) # digit 0 is the blank
+        dist = np.full(cells ** (k + 1), UNREACHABLE, dtype=np.uint8)
+        goal = [cells - 1] + [t - 1 for t in self.tiles]
+        frontier = np.array([sum(p * c for p, c in zip(goal, powers))], dtype=np.int64)
+        depth = 0
+        while len(frontier):
+            dist[frontier] = depth
+            layer = frontier
+            next_layer = []
+            while len(layer):
+                free = []
+                for step in range(4):
+                    moved, codes = self.expand(layer, step, powers)
+                    free.append(codes[~moved])
+                    next_layer.append(codes[moved])
+                layer = np.unique(np.concatenate(free))
+                layer = layer[dist[layer] == UNREACHABLE]
+                dist[layer] = depth
+            frontier = np.unique(np.concatenate(next_layer))
+            frontier = frontier[dist[frontier] == UNREACHABLE]
+            depth += 1
+        # the heuristic doesn't know where the blank is, so take the best blank position
+        return dist.reshape(-1, cells).min(axis=1)
+
+    def expand(self, codes, step, powers):
+        n, cells = self.n, self.cells
+        digits = (codes[:, None] // powers) % cells
+        blank = digits[:, 0]
+        r, c = blank // n + row[step], blank % n + col[step]
+        ok = (r >= 0) & (r < n) & (c >= 0) & (c < n)
+        codes, digits, blank = codes[ok], digits[ok], blank[ok]
+        target = (r * n + c)[ok]
+        hit = digits[:, 1:] == target[:, None] # which group tile (if any) sits where the blank goes
+        new_codes = codes + (target - blank) + (hit * powers[1:]).sum(axis=1) * (blank - target)
+        return hit.any(axis=1), new_codes
+
+    def index(self, board):
+        return sum(board.index(t) * self.cells ** i for i, t in enumerate(self.tiles))
+
+class Solver:
+    def __init__(self, n=4, partition=None, directory=None):
+        self.n = n
+        self.databases = [PatternDatabase(n, tiles, directory) for tiles in partition or default_partition(n)]
+        # for every tile: which database it belongs to and how much its position weighs in the index
+        self.owner = [None] * (n * n)
+        for d, db in enumerate(self.databases):
+            for i, t in enumerate(db.tiles):
+                self.owner[t] = (d, db.cells ** i)
+        self.nodes = 0
+
+    def heuristic(self, indices):
+        return sum(db.table[i] for db, i in zip(self.databases, indices))
+
+    def solve(self, board, verbose=False):
+        # board: list of rows or a flat list; returns the list of blank moves or None
+        n = self.n
+        board = [t for r in board for t in r] if isinstance(board[0], list) else list(board)
+        if not is_solvable(board, n):
+            return None
+        indices = [db.index(board) for db in self.databases]
+        tables = [db.table for db in self.databases]
+        owner = self.owner
+        path = []
+        self.nodes = 0
+        start = time.perf_counter()
+
+        def search(blank, g, bound, h, last):
+            # returns the smallest f over the bound, or -1 once the goal is found
+            self.nodes += 1
+            f = g + h
+            if f > bound:
+                return f
+            if h == 0 and board == goal:
+                return -1
+            best = float('inf')
+            x, y = divmod(blank, n)
+            for i in range(4):
+                if i == last ^ 2: # don't undo the previous move (directions 0-2 and 1-3 are opposite)
+                    continue
+                nx, ny = x + row[i], y + col[i]
+                if not (0 <= nx < n and 0 <= ny < n):
+                    continue
+                src = nx * n + ny
+                tile = board[src]
+                d, weight = owner[tile]
+                old = indices[d]
+                indices[d] = old + (blank - src) * weight
+                new_h = h - tables[d][old] + tables[d][indices[d]]
+                board[blank], board[src] = tile, 0
+                path.append(MOVE_NAMES[i])
+                t = search(src, g + 1, bound, new_h, i)
+                if t == -1:
+                    return -1
+                path.pop()
+                board[src], board[blank] = tile, 0
+                indices[d] = old
+                best = min(best, t)
+            return best
+
+        goal = list(range(1, n * n)) + [0]
+        h = self.heuristic(indices)
+        bound = h
+        while True:
+            t = search(board.index(0), 0, bound, h, -1)
+            if verbose:
+                print(f"bound {bound}: {self.nodes:,} nodes, {time.perf_counter() - start:.2f} s")
+            if t == -1:
+                return path
+            if t == float('inf'):
+                return None
+            bound = t
+
+def random_board(n, moves=None, rng=None):
+    # uniformly random solvable board (or a random walk of `moves` steps from the goal)
+    rng = rng or np.random.default_rng()
+    if moves is None:
+        while True:
+            board = [int(t) for t in rng.permutation(n * n)]
+            if is_solvable(board, n):
+                return board
+    board = list(range(1, n * n)) + [0]
+    blank, last = n * n - 1, -1
+    for _ in range(moves):
+        x, y = divmod(blank, n)
+        options = [i for i in range(4) if 0 <= x + row[i] < n and 0 <= y + col[i] < n and i != last ^ 2]
+        i = options[rng.integers(len(options))]
+        src = (x + row[i]) * n + y + col[i]
+        board[blank], board[src] = board[src], 0
+        blank, last = src, i
+    return board
+
+if __name__ == '__main__':
+    n = int(input('Puzzle width (3, 4, 5): ') or 4)
+    start = time.perf_counter()
+    solver = Solver(n)
+    print(f"Pattern databases ready in {time.perf_counter() - start:.1f} s")
+
+    board = random_board(n)
+    print("Board:", board)
+    start = time.perf_counter()
+    moves = solver.solve(board, verbose=True)
+    print(f"{len(moves)} moves: {''.join(moves)}")
+    print(f"{solver.nodes:,} nodes in {time.perf_counter() - start:.2f} s")
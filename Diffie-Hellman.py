@@ -1,40 +1,207 @@
+import json
+import os
 import random
 import hashlib
+import secrets
+import struct
+
+from RSA import SMALL_PRIMES, first_result, is_probable_prime, miller_rabin_rounds
+
+GROUP_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dh_groups.json')
+
+def safe_prime_candidates(start, size):
+    # odd q = start, start + 2, ... where neither q nor p = 2q + 1 has a factor in SMALL_PRIMES
+    start |= 1
+    sieve = bytearray([1]) * size # sieve[i] stands for q = start + 2*i
+    for r in SMALL_PRIMES[1:]:
+        half = pow(2, -1, r)
+        for bad in (0, -half % r): # q = 0 or p = 2q + 1 = 0 (mod r)
+            i = ((bad - start) * half) % r
+            q = start + 2 * i
+            if q == r or 2 * q + 1 == r: # r itself may be q or p, only strike larger multiples
+                i += r
+            sieve[i::r] = bytes(len(range(i, size, r)))
+    for i in range(size):
+        if sieve[i]:
+            yield start + 2 * i
+
+def scan_safe_prime_window(bits, window=1 << 16):
+    # one random window of q candidates, None if it holds no safe prime
+    if bits < 3:
+        raise ValueError("Safe primes need at least 3 bits")
+    rounds = miller_rabin_rounds(bits)
+    start = secrets.randbits(bits - 1) | (1 << (bits - 2)) | 1 # q has bits - 1 bits, so p has bits
+    for q in safe_prime_candidates(start, window):
+        p = 2 * q + 1
+        if p.bit_length() != bits:
+            break
+        # one cheap Fermat test on p first throws out almost every candidate
+        if pow(2, p - 1, p) == 1 and is_probable_prime(q, rounds) and is_probable_prime(p, rounds):
+            return p
+    return None
+
+def search_safe_prime(bits, window=1 << 16):
+    while True:
+        p = scan_safe_prime_window(bits, window)
+        if p is not None:
+            return p
+
+def generate_safe_prime(bits, workers=None):
+    if not workers or workers <= 1:
+        return search_safe_prime(bits)
+    # same race as RSA.generate_prime, smaller windows so the winner isn't kept waiting
+    return first_result(scan_safe_prime_window, (bits, 1 << 12), workers)
+
+def is_generator(p, g):
+    # p - 1 = 2q, so g generates the whole group unless g^2 = 1 or g^q = 1
+    q = (p - 1) // 2
+    return 1 < g < p - 1 and pow(g, 2, p) != 1 and pow(g, q, p) != 1
+
+def find_generator(p):
+    g = 2
+    while not is_generator(p, g):
+        g += 1
+    return g
+
+def check_parameters(p, g):
+    if not is_probable_prime(p):
+        return "p is not prime"
+    if not is_probable_prime((p - 1) // 2):
+        return "p is not a safe prime, generator can't be checked cheaply"
+    if not is_generator(p, g):
+        return "g is not a primitive root mod p"
+    return None
+
+def load_groups(path=GROUP_CACHE):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def get_group(bits, path=GROUP_CACHE, workers=None):
+    # validated (p, g) for this size, generated once and then read back from the cache file
+    groups = load_groups(path)
+    entry = groups.get(str(bits))
+    if entry is not None:
+        p, g = int(entry['p'], 16), entry['g']
+        if is_generator(p, g):
+            return p, g
+    p = generate_safe_prime(bits, workers)
+    g = find_generator(p)
+    groups[str(bits)] = {'p': format(p, 'x'), 'g': g}
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(groups, f, indent=2)
+    os.replace(tmp, path)
+    return p, g
+
+class FixedBaseGroup:
+    # Precomputed powers of a fixed g for fast g^x mod p (fixed-base windowed method).
+    # table[i][j] = g^(j * 2^(window*i)), so g^x is one multiplication per window-sized digit
+    # of x and no squarings at all. Built once per (p, g) and shared by every party.
+    HEADER = struct.Struct('>4sHI') # magic, window, bytes per number
+
+    def __init__(self, p, g, window=6, table=None):
+        self.p = p
+        self.g = g
+        self.window = window
+        self.digits = (p.bit_length() + window - 1) // window
+        self.table = table if table is not None else self.build_table()
+
+    def build_table(self):
+        table = []
+        base = self.g % self.p
+        for _ in range(self.digits):
+            row = [1]
+            for _ in range((1 << self.window) - 1):
+                row.append(row[-1] * base % self.p)
+            table.append(row)
+            base = row[-1] * base % self.p # g^(2^(window*(i+1)))
+        return table
+
+    def pow(self, x):
+        if x >= self.p:
+            x %= self.p - 1 # exponent only matters mod p-1 (Fermat)
+        p, mask, window = self.p, (1 << self.window) - 1, self.window
+        result = 1
+        for row in self.table:
+            if not x:
+                break
+            digit = x & mask
+            if digit:
+                result = result * row[digit] % p
+            x >>= window
+        return result
+
+    def save(self, path):
+        width = (self.p.bit_length() + 7) // 8
+        with open(path, 'wb') as f:
+            f.write(self.HEADER.pack(b'DHFB', self.window, width))
+            f.write(self.p.to_bytes(width, 'big') + self.g.to_bytes(width, 'big'))
+            for row in self.table:
+                f.write(b''.join(v.to_bytes(width, 'big') for v in row))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            magic, window, width = cls.HEADER.unpack(f.read(cls.HEADER.size))
+            if magic != b'DHFB':
+                raise ValueError(f"{path} is not a saved group")
+            p = int.from_bytes(f.read(width), 'big')
+            g = int.from_bytes(f.read(width), 'big')
+            data = f.read()
+        row_len = width << window
+        table = [[int.from_bytes(data[r + i:r + i + width], 'big') for i in range(0, row_len, width)]
+                 for r in range(0, len(data), row_len)]
+        return cls(p, g, window, table)
 
 class DiffieHellman:
-    def __init__(self, p, g):
+    def __init__(self, p, g, group=None, private_key=None):
+        if group is not None and (group.p != p or group.g != g):
+            raise ValueError("group was built for a different p and g")
         self.p = p
         self.g = g
-        self.private_key = random.randint(2, self.p - 2)
-        self.public_key = pow(self.g, self.private_key, self.p)
+        self.private_key = private_key if private_key is not None else random.randint(2, self.p - 2)
+        if group is not None:
+            self.public_key = group.pow(self.private_key)
+        else:
+            self.public_key = pow(self.g, self.private_key, self.p)
     
     def generate_shared_secret(self, other_public_key):
         shared_secret = pow(other_public_key, self.private_key, self.p)
         return shared_secret
 
-p = int(input("Enter a prime number (p): "))
-g = int(input("Enter a primitive root/generator (g): "))
+    def session_key(self, other_public_key):
+        secret = self.generate_shared_secret(other_public_key)
+        return hashlib.sha256(secret.to_bytes((self.p.bit_length() + 7) // 8, 'big')).digest()
+
+if __name__ == '__main__':
+    p = int(input("Enter a prime number (p): "))
+    g = int(input("Enter a primitive root/generator (g): "))
+    problem = check_parameters(p, g)
+    if problem:
+        print(f"Warning: {problem}")
 
-print("\nAlice is generating her keys...")
-alice = DiffieHellman(p, g)
-print(f"Alice's private key: {alice.private_key}")
-print(f"Alice's public key: {alice.public_key}")
+    print("\nAlice is generating her keys...")
+    alice = DiffieHellman(p, g)
+    print(f"Alice's private key: {alice.private_key}")
+    print(f"Alice's public key: {alice.public_key}")
 
-print("\nBob is generating his keys...")
-bob = DiffieHellman(p, g)
-print(f"Bob's private key: {bob.private_key}")
-print(f"Bob's public key: {bob.public_key}")
+    print("\nBob is generating his keys...")
+    bob = DiffieHellman(p, g)
+    print(f"Bob's private key: {bob.private_key}")
+    print(f"Bob's public key: {bob.public_key}")
 
-print("\nAlice and Bob exchange public keys...")
+    print("\nAlice and Bob exchange public keys...")
 
-alice_shared_secret = alice.generate_shared_secret(bob.public_key)
-bob_shared_secret = bob.generate_shared_secret(alice.public_key)
+    alice_shared_secret = alice.generate_shared_secret(bob.public_key)
+    bob_shared_secret = bob.generate_shared_secret(alice.public_key)
 
-print("\nShared secrets:")
-print(f"Alice's shared secret: {alice_shared_secret}")
-print(f"Bob's shared secret: {bob_shared_secret}")
+    print("\nShared secrets:")
+    print(f"Alice's shared secret: {alice_shared_secret}")
+    print(f"Bob's shared secret: {bob_shared_secret}")
 
-if alice_shared_secret == bob_shared_secret:
-    print("\nKey exchange successful! Both parties have the same shared secret.")
-else:
-    print("\nKey exchange failed!")
\ No newline at end of file
+    if alice_shared_secret == bob_shared_secret:
+        print("\nKey exchange successful! Both parties have the same shared secret.")
+    else:
+        print("\nKey exchange failed!")
@@ -1,28 +1,165 @@
 import math
 import random
+import secrets
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+def small_primes(limit):
+    sieve = bytearray([1]) * limit
+    sieve[0:2] = b'\x00\x00'
+    for i in range(2, int(limit ** 0.5) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = bytes(len(range(i * i, limit, i)))
+    return [i for i in range(limit) if sieve[i]]
+
+SMALL_PRIMES = small_primes(2000)
+
+def is_probable_prime(n, rounds=40):
+    if n < 2:
+        return False
+    for sp in SMALL_PRIMES:
+        if n % sp == 0:
+            return n == sp
+    # Miller-Rabin: n - 1 = 2^s * d with d odd
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for _ in range(rounds):
+        a = secrets.randbelow(n - 3) + 2
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = pow(x, 2, n)
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+def sieve_candidates(start, size):
+    # odd numbers start, start + 2, ... with no factor in SMALL_PRIMES
+    start |= 1
+    sieve = bytearray([1]) * size # sieve[i] stands for start + 2*i
+    for sp in SMALL_PRIMES[1:]:
+        i = (-start * pow(2, -1, sp)) % sp
+        if start + 2 * i == sp: # sp itself is prime, only strike its multiples
+            i += sp
+        sieve[i::sp] = bytes(len(range(i, size, sp)))
+    for i in range(size):
+        if sieve[i]:
+            yield start + 2 * i
+
+def miller_rabin_rounds(bits):
+    # rounds for a 2^-100 error on random candidates (FIPS 186-4, appendix C.3)
+    if bits >= 1024:
+        return 5
+    if bits >= 512:
+        return 7
+    return 40
+
+def scan_prime_window(bits, e=65537, window=4096):
+    # one random window of candidates, None if it holds no usable prime
+    if bits < 2:
+        raise ValueError("Primes need at least 2 bits")
+    # top two bits set so the product of two such primes has exactly 2*bits bits
+    start = secrets.randbits(bits) | (3 << (bits - 2)) | 1
+    for candidate in sieve_candidates(start, window):
+        if candidate.bit_length() != bits:
+            break
+        if math.gcd(e, candidate - 1) == 1 and is_probable_prime(candidate, miller_rabin_rounds(bits)):
+            return candidate
+    return None
+
+def search_prime(bits, e=65537, window=4096):
+    while True:
+        candidate = scan_prime_window(bits, e, window)
+        if candidate is not None:
+            return candidate
+
+_pools = {}
+
+def get_pool(workers):
+    # one long-lived pool per size, so repeated searches don't pay for process start-up
+    if workers not in _pools:
+        _pools[workers] = ProcessPoolExecutor(workers)
+    return _pools[workers]
+
+def first_result(task, args, workers):
+    # Keep 2 calls of task(*args) per worker queued on the shared pool and return the first
+    # result that isn't None. Each call is one short window, so nothing waits on a long
+    # search: queued calls are cancelled and the few still running finish on their own.
+    pool = get_pool(workers)
+    pending = {pool.submit(task, *args) for _ in range(2 * workers)}
+    try:
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if result is not None:
+                    return result
+            pending |= {pool.submit(task, *args) for _ in done}
+    finally:
+        for future in pending:
+            future.cancel()
+
+def generate_prime(bits, e=65537, workers=None):
+    if not workers or workers <= 1:
+        return search_prime(bits, e)
+    # every call scans its own random window, the first prime found wins
+    return first_result(scan_prime_window, (bits, e, 512), workers)
 
 class RSA:
-    def __init__(self, p, q):
+    def __init__(self, p, q, *primes, e=None, d=None):
+        # extra primes give a multi-prime key (n = p*q*r*...)
         self.p = p
         self.q = q
-        self.n = p*q
+        self.primes = [p, q, *primes]
+        self.n = math.prod(self.primes)
         self.phi_n = self.get_totient(self.p, self.q)
-        self.e = self.get_e(self.phi_n)
+        for r in primes:
+            self.phi_n *= r - 1
+        self.e = e if e is not None else self.get_e(self.phi_n)
         self.public_key = self.get_public_key(self.e, self.n)
-        self.d = self.get_d(self.e, self.phi_n)
+        self.d = d if d is not None else self.get_d(self.e, self.phi_n)
         self.private_key = self.get_private_key(self.d, self.n)
+        self.set_crt_params()
+
+    @classmethod
+    def generate(cls, bits=2048, e=65537, workers=None, num_primes=2):
+        if bits // num_primes < 8: # below this there aren't enough primes with the top two bits set
+            raise ValueError(f"Key size too small, need at least {8 * num_primes} bits")
+        # prime sizes add up to exactly bits; with the top two bits set a product of two primes
+        # always has the full size, but with more it can come up one bit short. Redrawing only
+        # the last prime can't always fix that (with four primes the first three may already be
+        # too small), so a short set is drawn again.
+        sizes = [bits // num_primes + (i < bits % num_primes) for i in range(num_primes)]
+        while True:
+            primes = []
+            while len(primes) < num_primes:
+                r = generate_prime(sizes[len(primes)], e, workers)
+                if r not in primes:
+                    primes.append(r)
+            if math.prod(primes).bit_length() == bits:
+                return cls(*primes, e=e)
 
     def extended_euclid(self, a, b):
-        if a == 0:
-            return b, 0, 1
-        else:
-            gcd, x, y = self.extended_euclid(b%a, a)
-            return gcd, y - (b//a) * x, x
+        # iterative, so big moduli can't hit the recursion limit
+        x0, x1, y0, y1 = 0, 1, 1, 0
+        while a != 0:
+            quotient = b // a
+            a, b = b % a, a
+            x0, x1 = x1, x0 - quotient * x1
+            y0, y1 = y1, y0 - quotient * y1
+        return b, x0, y0
 
     def get_totient(self, p, q):
         return (p-1)*(q-1)
 
     def get_e(self, phi_n):
+        if 65537 < phi_n and math.gcd(phi_n, 65537) == 1:
+            return 65537
+        # small lab primes: pick a random e coprime to phi_n
         e = 0
         while e == 0:
             for i in range(2, phi_n):
@@ -51,22 +188,71 @@ class RSA:
         return pow(M, public_key[0], public_key[1])
 
     def decryption(self, M,  private_key):
+        if private_key == self.private_key:
+            return self.decrypt_crt(M)
         return pow(M, private_key[0], private_key[1])
 
+    def mod_inverse(self, a, m):
+        gcd, x, y = self.extended_euclid(a, m)
+        return x % m
+
+    # Chinese Remainder Theorem (RFC 8017): exponentiate modulo each prime with a reduced
+    # exponent and recombine, instead of one full size pow(M, d, n)
+    def set_crt_params(self):
+        self.crt_exponents = [self.d % (r - 1) for r in self.primes]
+        self.dp, self.dq = self.crt_exponents[0], self.crt_exponents[1]
+        self.q_inv = self.mod_inverse(self.q, self.p)
+        self.crt_coefficients = [] # t_i = (r_1 * ... * r_(i-1))^-1 mod r_i for the extra primes
+        R = self.p * self.q
+        for r in self.primes[2:]:
+            self.crt_coefficients.append(self.mod_inverse(R % r, r))
+            R *= r
+
+    def decrypt_crt(self, C):
+        p, q = self.p, self.q
+        m1 = pow(C % p, self.dp, p)
+        m2 = pow(C % q, self.dq, q)
+        h = (self.q_inv * (m1 - m2)) % p
+        M = m2 + h * q
+        R = p * q
+        for r, d_r, t in zip(self.primes[2:], self.crt_exponents[2:], self.crt_coefficients):
+            m_r = pow(C % r, d_r, r)
+            M += R * (((m_r - M) * t) % r)
+            R *= r
+        return M
+
+    def decrypt_many(self, ciphertexts):
+        # bind the CRT parameters once for the whole batch
+        p, q, dp, dq, q_inv = self.p, self.q, self.dp, self.dq, self.q_inv
+        if len(self.primes) > 2:
+            return [self.decrypt_crt(C) for C in ciphertexts]
+        result = []
+        for C in ciphertexts:
+            m2 = pow(C % q, dq, q)
+            result.append(m2 + q * ((q_inv * (pow(C % p, dp, p) - m2)) % p))
+        return result
+
+    def sign(self, M):
+        return self.decrypt_crt(M)
+
+    def verify(self, S, M, public_key):
+        return self.encryption(S, public_key) == M % public_key[1]
+
 
-p = int(input('Enter prime number 1: '))
-q = int(input('Enter prime number 2: '))
-obj = RSA(p,q)
+if __name__ == '__main__':
+    p = int(input('Enter prime number 1: '))
+    q = int(input('Enter prime number 2: '))
+    obj = RSA(p,q)
 
-print('n: ', obj.n)
-print('phi_n: ', obj.phi_n)
-print('e: ', obj.e)
-print('d: ', obj.d)
-print('public key: ', obj.public_key)
-print('private key: ', obj.private_key)
+    print('n: ', obj.n)
+    print('phi_n: ', obj.phi_n)
+    print('e: ', obj.e)
+    print('d: ', obj.d)
+    print('public key: ', obj.public_key)
+    print('private key: ', obj.private_key)
 
-M = int(input('Enter decimal number: '))
-C = obj.encryption(M, obj.public_key)
-print('ciphertext : ', C)
-M_2 = obj.decryption(C, obj.private_key)
-print('decrypted message: ', M_2)
\ No newline at end of file
+    M = int(input('Enter decimal number: '))
+    C = obj.encryption(M, obj.public_key)
+    print('ciphertext : ', C)
+    M_2 = obj.decryption(C, obj.private_key)
+    print('decrypted message: ', M_2)
@@ -1,3 +1,5 @@
+import numpy as np
+
 class SAES:
     def __init__(self, key):
         self.s_box = [
@@ -18,6 +20,13 @@ class SAES:
         self.key_list = self.generate_keys(self.key)
         self.mix_column_matrix = [ [1, 4], [4, 1] ]
         self.inv_mix_column_matrix = [ [9, 2], [2, 9] ]
+        if SAES.tables is None:
+            SAES.tables = self.build_tables() # key independent, built once per process
+        self.round_keys = [int(k, 2) for k in self.key_list]
+        # equivalent inverse cipher: InvMixColumns is linear, so apply it to K1 instead of the state
+        self.inv_mixed_key1 = self.mix_columns_int(self.round_keys[1], self.inv_mix_column_matrix)
+
+    tables = None
 
     def xor(self, a, b, type='016b'):
         return format(int(a, 2) ^ int(b, 2), type)
@@ -90,6 +99,13 @@ class SAES:
         return self.xor(state, key)
 
     def encrypt(self, plaintext):
+        return format(self.encrypt_int(int(plaintext, 2)), '016b')
+
+    def decrypt(self, ciphertext):
+        return format(self.decrypt_int(int(ciphertext, 2)), '016b')
+
+    # Step by step string versions, kept to check the table driven engine against
+    def encrypt_rounds(self, plaintext):
         state = self.add_round_key(plaintext, self.key_list[0])
         state = self.sub_nib(state, self.s_box)
         state = self.shift_rows(state)
@@ -100,7 +116,7 @@ class SAES:
         ciphertext = self.add_round_key(state, self.key_list[2])
         return ciphertext
 
-    def decrypt(self, ciphertext):
+    def decrypt_rounds(self, ciphertext):
         state = self.add_round_key(ciphertext, self.key_list[2])
         state = self.shift_rows(state)
         state = self.sub_nib(state, self.inv_s_box)
@@ -111,12 +127,128 @@ class SAES:
         plaintext = self.add_round_key(state, self.key_list[0])
         return plaintext
 
-key = input('Enter 16 bit key: ') # 16-bit binary key
-plaintext = input('Enter 16 bit text: ') # 16-bit binary string
-saes = SAES(key)
-cipher = saes.encrypt(plaintext)
-decrypted = saes.decrypt(cipher)
+    # 16 bit integer engine. State nibbles are n0 n1 n2 n3 from the high end.
+    def sub_nib_int(self, state, sbox):
+        result = 0
+        for shift in (12, 8, 4, 0):
+            result |= sbox[(state >> shift) & 0xF] << shift
+        return result
+
+    def shift_rows_int(self, state):
+        return (state & 0xF0F0) | ((state & 0x0F00) >> 8) | ((state & 0x000F) << 8) # swap n1 and n3
+
+    def mix_columns_int(self, state, mc):
+        mul = SAES.tables['gf_mult']
+        n = [(state >> shift) & 0xF for shift in (12, 8, 4, 0)]
+        result = [
+            mul[mc[0][0]][n[0]] ^ mul[mc[0][1]][n[1]],
+            mul[mc[1][0]][n[0]] ^ mul[mc[1][1]][n[1]],
+            mul[mc[0][0]][n[2]] ^ mul[mc[0][1]][n[3]],
+            mul[mc[1][0]][n[2]] ^ mul[mc[1][1]][n[3]],
+        ]
+        return (result[0] << 12) | (result[1] << 8) | (result[2] << 4) | result[3]
+
+    def build_tables(self):
+        tables = {'gf_mult': [[self.gf_mult(a, b) for b in range(16)] for a in range(16)]}
+        SAES.tables = tables # mix_columns_int needs gf_mult while the rest is built
+        sbox = [int(self.s_box[i >> 2][i & 3], 16) for i in range(16)]
+        inv_sbox = [int(self.inv_s_box[i >> 2][i & 3], 16) for i in range(16)]
+        mc, inv_mc = self.mix_column_matrix, self.inv_mix_column_matrix
+
+        # SubNibbles works per nibble and ShiftRows/MixColumns are linear, so a round splits
+        # into one lookup per input byte: round(s) = hi[s >> 8] ^ lo[s & 0xFF]
+        def split(step, sb):
+            hi = [step(self.sub_nib_int(b << 8, sb) & 0xFF00) for b in range(256)]
+            lo = [step(self.sub_nib_int(b, sb) & 0x00FF) for b in range(256)]
+            return hi, lo
+
+        tables['enc_hi'], tables['enc_lo'] = split(lambda s: self.mix_columns_int(self.shift_rows_int(s), mc), sbox)
+        tables['enc_last_hi'], tables['enc_last_lo'] = split(self.shift_rows_int, sbox)
+        tables['dec_hi'], tables['dec_lo'] = split(lambda s: self.mix_columns_int(self.shift_rows_int(s), inv_mc), inv_sbox)
+        tables['dec_last_hi'], tables['dec_last_lo'] = split(self.shift_rows_int, inv_sbox)
+        tables['sbox'], tables['inv_sbox'] = sbox, inv_sbox
+        return tables
+
+    def encrypt_int(self, block):
+        t = SAES.tables
+        k0, k1, k2 = self.round_keys
+        state = block ^ k0
+        state = t['enc_hi'][state >> 8] ^ t['enc_lo'][state & 0xFF] ^ k1
+        return t['enc_last_hi'][state >> 8] ^ t['enc_last_lo'][state & 0xFF] ^ k2
+
+    def decrypt_int(self, block):
+        t = SAES.tables
+        k0, k1, k2 = self.round_keys
+        state = block ^ k2
+        state = t['dec_hi'][state >> 8] ^ t['dec_lo'][state & 0xFF] ^ self.inv_mixed_key1
+        return t['dec_last_hi'][state >> 8] ^ t['dec_last_lo'][state & 0xFF] ^ k0
+
+    # NumPy batch engine over uint16 arrays. Each round step is applied to the whole batch
+    # through the fused lookup tables above; work is done in slices so the index temporaries
+    # stay small, and results go straight into out (which may be data itself).
+    array_chunk = 1 << 16
+
+    def get_array_tables(self):
+        if SAES.array_tables is None:
+            SAES.array_tables = {name: np.array(table, dtype=np.uint16)
+                                 for name, table in SAES.tables.items() if name.startswith(('enc', 'dec'))}
+        return SAES.array_tables
+
+    array_tables = None
+
+    def round_array(self, state, hi_table, lo_table, key, out):
+        # out = hi_table[state >> 8] ^ lo_table[state & 0xFF] ^ key
+        lo = state & 0xFF
+        np.right_shift(state, 8, out=out)
+        np.take(hi_table, out, out=out)
+        out ^= np.take(lo_table, lo)
+        out ^= np.uint16(key)
+        return out
+
+    def process_array(self, data, out, first_key, tables, middle_key, last_key):
+        data = np.asarray(data)
+        if data.dtype != np.uint16:
+            raise TypeError("Expected an array of uint16")
+        if out is None:
+            out = np.empty(data.shape, dtype=np.uint16) # always C ordered, whatever data is
+        elif out.shape != data.shape or out.dtype != np.uint16:
+            raise ValueError("out must be a uint16 array with the same shape as data")
+        elif not out.flags.c_contiguous:
+            raise ValueError("out must be contiguous")
+        flat_in, flat_out = data.reshape(-1), out.reshape(-1)
+        hi, lo, last_hi, last_lo = tables
+        for i in range(0, flat_in.size, self.array_chunk):
+            state = flat_in[i:i + self.array_chunk] ^ np.uint16(first_key)
+            dest = flat_out[i:i + self.array_chunk]
+            self.round_array(state, hi, lo, middle_key, state)
+            self.round_array(state, last_hi, last_lo, last_key, dest)
+        return out
+
+    def encrypt_array(self, data, out=None):
+        t = self.get_array_tables()
+        k0, k1, k2 = self.round_keys
+        return self.process_array(data, out, k0, (t['enc_hi'], t['enc_lo'], t['enc_last_hi'], t['enc_last_lo']), k1, k2)
+
+    def decrypt_array(self, data, out=None):
+        t = self.get_array_tables()
+        k0, k1, k2 = self.round_keys
+        return self.process_array(data, out, k2, (t['dec_hi'], t['dec_lo'], t['dec_last_hi'], t['dec_last_lo']), self.inv_mixed_key1, k0)
+
+    block_size = 2 # bytes per block, used by block_modes.py
+
+    def encrypt_block(self, block):
+        return self.encrypt_int(block)
+
+    def decrypt_block(self, block):
+        return self.decrypt_int(block)
+
+if __name__ == '__main__':
+    key = input('Enter 16 bit key: ') # 16-bit binary key
+    plaintext = input('Enter 16 bit text: ') # 16-bit binary string
+    saes = SAES(key)
+    cipher = saes.encrypt(plaintext)
+    decrypted = saes.decrypt(cipher)
 
-print("Plaintext:", plaintext)
-print("Encrypted:", cipher)
-print("Decrypted:", decrypted)
+    print("Plaintext:", plaintext)
+    print("Encrypted:", cipher)
+    print("Decrypted:", decrypted)
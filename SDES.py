@@ -20,6 +20,7 @@ class SDES:
         ]
         self.key = key
         self.key_list = self.generate_keys()
+        self.encrypt_table, self.decrypt_table = self.build_tables()
 
     def permute(self, bits, pattern):
         return ''.join(bits[i] for i in pattern)
@@ -95,13 +96,60 @@ class SDES:
         preoutput = L2 + R2
         return self.permute(preoutput, self.IP_inv)
 
-key = input('Enter 10 bit key: ') # 10-bit binary key
-plaintext = input('Enter 8 bit text: ') # 8-bit binary string
-
-sdes = SDES(key)
-ciphertext = sdes.encrypt(plaintext)
-decrypted = sdes.decrypt(ciphertext)
-
-print("Plaintext:", plaintext)
-print("Ciphertext:", ciphertext)
-print("Decrypted :", decrypted)
+    # Integer engine: same steps as above on ints, used to build byte lookup tables
+    def permute_int(self, value, pattern, width):
+        result = 0
+        for i in pattern:
+            result = (result << 1) | ((value >> (width - 1 - i)) & 1)
+        return result
+
+    def substitute_int(self, nibble, sbox):
+        row = ((nibble >> 2) & 2) | (nibble & 1) # bits 0 and 3
+        col = (nibble >> 1) & 3 # bits 1 and 2
+        return sbox[row][col]
+
+    def F_int(self, R, K):
+        xored = self.permute_int(R, self.EP, 4) ^ K
+        combined = (self.substitute_int(xored >> 4, self.S0) << 2) | self.substitute_int(xored & 0xF, self.S1)
+        return self.permute_int(combined, self.P4, 4)
+
+    def feistel_int(self, block, k_first, k_second):
+        ip = self.permute_int(block, self.IP, 8)
+        L, R = ip >> 4, ip & 0xF
+        L = L ^ self.F_int(R, k_first)
+        L, R = R, L # swapped
+        L = L ^ self.F_int(R, k_second)
+        return self.permute_int((L << 4) | R, self.IP_inv, 8)
+
+    def build_tables(self):
+        k1, k2 = (int(k, 2) for k in self.key_list)
+        encrypt_table = bytes(self.feistel_int(b, k1, k2) for b in range(256))
+        decrypt_table = bytes(self.feistel_int(b, k2, k1) for b in range(256))
+        return encrypt_table, decrypt_table
+
+    def encrypt_bytes(self, data):
+        # every byte is one 8 bit block, so bytes.translate does the whole buffer in C
+        return bytes(data).translate(self.encrypt_table)
+
+    def decrypt_bytes(self, data):
+        return bytes(data).translate(self.decrypt_table)
+
+    block_size = 1 # bytes per block, used by block_modes.py
+
+    def encrypt_block(self, block):
+        return self.encrypt_table[block]
+
+    def decrypt_block(self, block):
+        return self.decrypt_table[block]
+
+if __name__ == '__main__':
+    key = input('Enter 10 bit key: ') # 10-bit binary key
+    plaintext = input('Enter 8 bit text: ') # 8-bit binary string
+
+    sdes = SDES(key)
+    ciphertext = sdes.encrypt(plaintext)
+    decrypted = sdes.decrypt(ciphertext)
+
+    print("Plaintext:", plaintext)
+    print("Ciphertext:", ciphertext)
+    print("Decrypted :", decrypted)
@@ -0,0 +1,247 @@
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+import numpy as np
+
+# Recovering the key of the columnar transposition in v2.py from ciphertext only.
+#
+# Candidates are scored with an n-gram log-probability table over A-Z plus one "other" symbol.
+# For a key length n, v2 keys are lists where key[col] is the rank of column col, so the
+# search works on 0-based rank permutations and reports key = [rank + 1 for rank in perm].
+#  - short keys: every permutation, scored in NumPy batches and split across a process pool
+#  - full grids (length % n == 0): branch and bound on column adjacency scores, where placing
+#    ciphertext segment b right after segment a scores the n-grams across that column boundary
+#  - long keys: hill climbing with random restarts, one restart per pool task
+
+SAMPLE_TEXT = """
+It was late in the evening when the message finally arrived at the station. The operator
+read it twice before he understood that the letters had been shuffled by column, and that
+the key was nowhere to be found. He wrote the text out in rows of different widths and
+looked for common words such as the, and, that, with and from. When a row began to read
+like ordinary English he knew he was close. There is nothing magic about breaking a
+transposition cipher: the letters are all still there, only their order has changed, and
+the order of letters in a language is far from random. A careful count of which pairs
+and triples of letters appear most often is enough to tell a good guess from a bad one.
+The rest is patience, a sharp pencil and a willingness to start again when the text stops
+making sense. By morning the whole message was on the table, and it said that the train
+would leave at noon from the northern platform, carrying the documents for the meeting.
+"""
+
+ALPHABET = 27  # A-Z and one symbol for everything else
+
+@dataclass
+class SearchReport:
+    best: List[Tuple[float, List[int], str]] = field(default_factory=list)  # (score, key, plaintext)
+    evaluated: int = 0
+    seconds: float = 0.0
+
+    @property
+    def per_second(self) -> float:
+        return self.evaluated / self.seconds if self.seconds else float('inf')
+
+def to_symbols(text):
+    data = np.frombuffer(text.upper().encode('latin-1', 'replace'), dtype=np.uint8).astype(np.int64) - ord('A')
+    data[(data < 0) | (data >= 26)] = 26
+    return data
+
+class NgramScorer:
+    def __init__(self, text=SAMPLE_TEXT, n=3):
+        # log probabilities with add-one smoothing, indexed by the base 27 code of the n-gram
+        self.n = n
+        symbols = to_symbols(' '.join(text.split()))
+        counts = np.ones(ALPHABET ** n)
+        np.add.at(counts, self.codes(symbols), 1)
+        self.table = np.log(counts / counts.sum())
+        # bigram table for column adjacency, a boundary between two columns is one letter pair
+        pair_counts = np.ones((ALPHABET, ALPHABET))
+        np.add.at(pair_counts, (symbols[:-1], symbols[1:]), 1)
+        self.pair_table = np.log(pair_counts / pair_counts.sum())
+
+    def codes(self, symbols):
+        # symbols has the text along its last axis
+        length = symbols.shape[-1] - self.n + 1
+        codes = np.zeros(symbols.shape[:-1] + (max(length, 0),), dtype=np.int64)
+        for i in range(self.n):
+            codes = codes * ALPHABET + symbols[..., i:i + length]
+        return codes
+
+    def score(self, symbols):
+        return self.table[self.codes(symbols)].sum(axis=-1)
+
+def gather_indices(perms, length):
+    # perms: (K, n) ranks per column. Returns (K, length) ciphertext index of every plaintext position.
+    perms = np.asarray(perms)
+    n = perms.shape[1]
+    rows = -(-length // n)
+    long_cols = length % n or n
+    lens = np.where(np.arange(n) < long_cols, rows, rows - 1)
+    col_of_rank = np.argsort(perms, axis=1)
+    lens_by_rank = lens[col_of_rank]
+    starts_by_rank = np.cumsum(lens_by_rank, axis=1) - lens_by_rank
+    starts_by_col = np.take_along_axis(starts_by_rank, perms, axis=1)
+    positions = np.arange(length)
+    return starts_by_col[:, positions % n] + positions // n
+
+def score_perms(symbols, perms, scorer):
+    return scorer.score(symbols[gather_indices(perms, len(symbols))])
+
+def decrypt_with(ciphertext, perm):
+    return ''.join(ciphertext[i] for i in gather_indices([perm], len(ciphertext))[0])
+
+def keep_best(best, scores, perms, top):
+    for i in np.argsort(scores)[::-1][:top]:
+        best.append((float(scores[i]), [int(r) for r in perms[i]]))
+    best.sort(key=lambda item: item[0], reverse=True)
+    del best[top:]
+
+def _exhaustive_task(args):
+    # every permutation that starts with the given prefix
+    ciphertext, n, prefix, scorer, top, batch = args
+    symbols = to_symbols(ciphertext)
+    rest = [r for r in range(n) if r not in prefix]
+    best = []
+    evaluated = 0
+    perms = (list(prefix) + list(tail) for tail in itertools.permutations(rest))
+    while True:
+        chunk = list(itertools.islice(perms, batch))
+        if not chunk:
+            break
+        chunk = np.array(chunk)
+        keep_best(best, score_perms(symbols, chunk, scorer), chunk, top)
+        evaluated += len(chunk)
+    return best, evaluated
+
+def adjacency_matrix(symbols, n, scorer):
+    # full grid only: segment a followed by segment b scores the n-grams across that boundary
+    segments = symbols.reshape(n, len(symbols) // n)
+    # scores[a, b] = sum over rows of log P(segment a letter, segment b letter)
+    scores = scorer.pair_table[segments[:, None, :], segments[None, :, :]].sum(axis=-1)
+    np.fill_diagonal(scores, -np.inf)
+    return scores
+
+def branch_and_bound(symbols, n, scorer, top=5):
+    adj = adjacency_matrix(symbols, n, scorer)
+    best_out = adj.max(axis=1)
+    best = []  # (score, segment order)
+    evaluated = 0
+
+    def dfs(order, used, score):
+        nonlocal evaluated
+        evaluated += 1
+        if len(order) == n:
+            best.append((score, list(order)))
+            best.sort(key=lambda item: item[0], reverse=True)
+            del best[top:]
+            return
+        last = order[-1]
+        # optimistic bound: every remaining step takes the best edge out of an unused segment
+        remaining = [s for s in range(n) if not used[s]]
+        bound = score + sum(sorted((best_out[s] for s in [last] + remaining), reverse=True)[:len(remaining)])
+        if len(best) == top and bound <= best[-1][0]:
+            return
+        for s in sorted(remaining, key=lambda s: -adj[last, s]):
+            used[s] = True
+            order.append(s)
+            dfs(order, used, score + adj[last, s])
+            order.pop()
+            used[s] = False
+
+    for first in range(n):
+        used = [False] * n
+        used[first] = True
+        dfs([first], used, 0.0)
+    # plaintext column c holds ciphertext segment order[c], which is the column's rank
+    return [(score, order) for score, order in best], evaluated
+
+def _climb_task(args):
+    ciphertext, n, scorer, seed, steps = args
+    rng = random.Random(seed)
+    symbols = to_symbols(ciphertext)
+    perm = list(range(n))
+    rng.shuffle(perm)
+    score = float(score_perms(symbols, [perm], scorer)[0])
+    evaluated = 1
+    stale = 0
+    while stale < steps:
+        # a batch of neighbours: swaps, segment reversals and rotations
+        neighbours = []
+        for _ in range(64):
+            i, j = sorted(rng.sample(range(n), 2))
+            candidate = perm[:]
+            move = rng.random()
+            if move < 0.5:
+                candidate[i], candidate[j] = candidate[j], candidate[i]
+            elif move < 0.8:
+                candidate[i:j + 1] = candidate[i:j + 1][::-1]
+            else:
+                shift = rng.randrange(1, n)
+                candidate = candidate[shift:] + candidate[:shift]
+            neighbours.append(candidate)
+        scores = score_perms(symbols, neighbours, scorer)
+        evaluated += len(neighbours)
+        i = int(np.argmax(scores))
+        if scores[i] > score:
+            perm, score = neighbours[i], float(scores[i])
+            stale = 0
+        else:
+            stale += 1
+    return [(score, perm)], evaluated
+
+def run_tasks(task, args_list, workers):
+    if not workers or workers <= 1:
+        return [task(args) for args in args_list]
+    with ProcessPoolExecutor(workers) as pool:
+        return list(pool.map(task, args_list))
+
+def crack(ciphertext, key_length, scorer=None, workers=None, top=5, max_exhaustive=9, restarts=16, steps=200):
+    scorer = scorer or NgramScorer()
+    workers = workers or os.cpu_count()
+    n = key_length
+    start = time.perf_counter()
+    if n <= max_exhaustive:
+        prefixes = [p for p in itertools.permutations(range(n), min(2, n))]
+        results = run_tasks(_exhaustive_task, [(ciphertext, n, p, scorer, top, 4096) for p in prefixes], workers)
+    elif len(ciphertext) % n == 0 and n <= 12:
+        symbols = to_symbols(ciphertext)
+        paths, evaluated = branch_and_bound(symbols, n, scorer, max(top, 20))
+        # adjacency ignores the wrap from one row to the next, so a rotation of the best path
+        # scores almost the same; rescore every rotation with the full n-gram table
+        perms = np.array([order[i:] + order[:i] for _, order in paths for i in range(n)])
+        best = []
+        keep_best(best, score_perms(symbols, perms, scorer), perms, top)
+        results = [(best, evaluated + len(perms))]
+    else:
+        results = run_tasks(_climb_task, [(ciphertext, n, scorer, seed, steps) for seed in range(restarts)], workers)
+
+    report = SearchReport()
+    candidates = []
+    for best, evaluated in results:
+        candidates.extend(best)
+        report.evaluated += evaluated
+    candidates.sort(key=lambda item: item[0], reverse=True)
+    seen = set()
+    for score, perm in candidates:
+        if tuple(perm) in seen:
+            continue
+        seen.add(tuple(perm))
+        report.best.append((score, [r + 1 for r in perm], decrypt_with(ciphertext, perm)))
+        if len(report.best) == top:
+            break
+    report.seconds = time.perf_counter() - start
+    return report
+
+if __name__ == '__main__':
+    ciphertext = input("Enter the ciphertext: ")
+    lengths = input("Key lengths to try (e.g. 3-8): ")
+    low, _, high = lengths.partition('-')
+    for n in range(int(low), int(high or low) + 1):
+        report = crack(ciphertext, n)
+        print(f"\nKey length {n}: {report.evaluated:,} candidates in {report.seconds:.2f} s "
+              f"({report.per_second:,.0f}/s)")
+        for score, key, plaintext in report.best[:3]:
+            print(f"  {score:9.1f}  {key}  {plaintext[:60]}")
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 def encrypt(message, key):
 
     num_rows = (len(message) + key - 1) // key
@@ -45,17 +47,47 @@ def decrypt(ciphertext, key):
     
     return plaintext
 
-message = input("Enter the message: ")
-key = int(input("Enter the key (number of columns): "))
+# Permutation engine: the ciphertext is the columns message[col::key] one after another, so
+# the column offsets for a (length, key) are computed once, cached, and applied with slicing.
+# Works on str and bytes.
+@lru_cache(maxsize=1024)
+def column_layout(length, key):
+    layout = []
+    start = 0
+    for col in range(key):
+        end = start + len(range(col, length, key))
+        layout.append((col, start, end))
+        start = end
+    return layout
+
+def fast_encrypt(message, key):
+    return message[:0].join(message[col::key] for col in range(key))
+
+def fast_decrypt(ciphertext, key):
+    is_text = isinstance(ciphertext, str)
+    plaintext = [''] * len(ciphertext) if is_text else bytearray(len(ciphertext))
+    for col, start, end in column_layout(len(ciphertext), key):
+        plaintext[col::key] = ciphertext[start:end]
+    return ''.join(plaintext) if is_text else bytes(plaintext)
+
+def encrypt_many(messages, key):
+    return [fast_encrypt(m, key) for m in messages]
+
+def decrypt_many(ciphertexts, key):
+    return [fast_decrypt(c, key) for c in ciphertexts]
+
+if __name__ == '__main__':
+    message = input("Enter the message: ")
+    key = int(input("Enter the key (number of columns): "))
     
-if key <= 0:
-    print("Key must be a positive integer.")
-elif key >= len(message):
-    print("Warning: Key should be smaller than message length for effective encryption.")
+    if key <= 0:
+        print("Key must be a positive integer.")
+    elif key >= len(message):
+        print("Warning: Key should be smaller than message length for effective encryption.")
     
-encrypted_message = encrypt(message, key)
-print(f"\nEncrypted message: {encrypted_message}")
+    encrypted_message = encrypt(message, key)
+    print(f"\nEncrypted message: {encrypted_message}")
     
-decrypted_message = decrypt(encrypted_message, key)
-print(f"Decrypted message: {decrypted_message}")
+    decrypted_message = decrypt(encrypted_message, key)
+    print(f"Decrypted message: {decrypted_message}")
 
@@ -1,3 +1,11 @@
+import struct
+import time
+from functools import lru_cache, partial
+
+import numpy as np
+
+from streaming import map_ordered, read_chunks # repository root, run as python -m Transposition.v2
+
 def encrypt(plaintext, key):
     num_cols = len(key)
     num_rows = (len(plaintext) + num_cols - 1) // num_cols
@@ -61,6 +69,123 @@ def decrypt(ciphertext, key):
     
     return plaintext
 
+# Permutation engine: for a given (length, key) the ciphertext is just the columns message[col::n]
+# in key order, so the layout is computed once, cached, and applied with slicing. Unlike
+# encrypt/decrypt above there is no 'X' padding, so real X characters survive. Works on str and bytes.
+@lru_cache(maxsize=1024)
+def column_layout(length, key):
+    num_cols = len(key)
+    layout = []
+    start = 0
+    for _, col in sorted((k, i) for i, k in enumerate(key)):
+        end = start + len(range(col, length, num_cols))
+        layout.append((col, start, end))
+        start = end
+    return layout
+
+def fast_encrypt(plaintext, key):
+    num_cols = len(key)
+    layout = column_layout(len(plaintext), tuple(key))
+    return plaintext[:0].join(plaintext[col::num_cols] for col, _, _ in layout)
+
+def fast_decrypt(ciphertext, key):
+    num_cols = len(key)
+    is_text = isinstance(ciphertext, str)
+    plaintext = [''] * len(ciphertext) if is_text else bytearray(len(ciphertext))
+    for col, start, end in column_layout(len(ciphertext), tuple(key)):
+        plaintext[col::num_cols] = ciphertext[start:end]
+    return ''.join(plaintext) if is_text else bytes(plaintext)
+
+def encrypt_many(messages, key):
+    return [fast_encrypt(m, key) for m in messages]
+
+def decrypt_many(ciphertexts, key):
+    return [fast_decrypt(c, key) for c in ciphertexts]
+
+# Batch mode: a batch of equal-length messages is a 2D uint8 array with one message per row.
+# Full grids are a reshape to (batch, rows, cols), a column permutation and a transpose;
+# a ragged last row is handled by gathering with the cached index of each ciphertext position.
+def column_order(key):
+    return [col for col, _, _ in column_layout(0, tuple(key))]
+
+@lru_cache(maxsize=1024)
+def gather_index(length, key):
+    num_cols = len(key)
+    return np.concatenate([np.arange(col, length, num_cols) for col, _, _ in column_layout(length, key)])
+
+def batch_encrypt(messages, key):
+    messages = np.asarray(messages, dtype=np.uint8)
+    batch, length = messages.shape
+    num_cols = len(key)
+    if length % num_cols == 0:
+        grid = messages.reshape(batch, length // num_cols, num_cols)
+        return grid[:, :, column_order(key)].transpose(0, 2, 1).reshape(batch, length)
+    return messages[:, gather_index(length, tuple(key))]
+
+def batch_decrypt(ciphertexts, key):
+    ciphertexts = np.asarray(ciphertexts, dtype=np.uint8)
+    batch, length = ciphertexts.shape
+    num_cols = len(key)
+    if length % num_cols == 0:
+        columns = ciphertexts.reshape(batch, num_cols, length // num_cols)
+        plaintexts = np.empty((batch, length // num_cols, num_cols), dtype=np.uint8)
+        plaintexts[:, :, column_order(key)] = columns.transpose(0, 2, 1)
+        return plaintexts.reshape(batch, length)
+    plaintexts = np.empty_like(ciphertexts)
+    plaintexts[:, gather_index(length, tuple(key))] = ciphertexts
+    return plaintexts
+
+def benchmark(batch=1000, length=1000, key=(3, 1, 4, 2, 5, 7, 6)):
+    messages = np.random.randint(ord('A'), ord('Z') + 1, (batch, length), dtype=np.uint8)
+    texts = [row.tobytes().decode() for row in messages]
+    key = list(key)
+    for name, run in [('loops', lambda: [encrypt(t, key) for t in texts]),
+                      ('slices', lambda: encrypt_many(texts, key)),
+                      ('numpy', lambda: batch_encrypt(messages, key))]:
+        start = time.perf_counter()
+        run()
+        seconds = time.perf_counter() - start
+        print(f"{name:>6}: {seconds:.4f} s, {batch * length / seconds / 1e6:,.1f} MB/s")
+
+# Streaming mode: the input is cut into fixed size blocks, each block is transposed on its own
+# and written as a 4 byte big-endian length followed by the block, so no padding is needed
+# and decryption knows exactly where every block ends.
+BLOCK_SIZE = 1 << 20
+FRAME = struct.Struct('>I')
+
+def read_frames(src):
+    while True:
+        # read_chunks fills short reads, so only a real end of stream comes back short
+        header = next(read_chunks(src, FRAME.size), b'')
+        if not header:
+            return
+        if len(header) < FRAME.size:
+            raise ValueError("Truncated block header")
+        (length,) = FRAME.unpack(header)
+        block = next(read_chunks(src, length), b'')
+        if len(block) < length:
+            raise ValueError("Truncated block")
+        yield block
+
+def encrypt_stream(src, dst, key, block_size=BLOCK_SIZE, workers=None):
+    if block_size < 1:
+        raise ValueError("block_size must be at least 1")
+    for block in map_ordered(partial(fast_encrypt, key=key), read_chunks(src, block_size), workers):
+        dst.write(FRAME.pack(len(block)))
+        dst.write(block)
+
+def decrypt_stream(src, dst, key, workers=None):
+    for block in map_ordered(partial(fast_decrypt, key=key), read_frames(src), workers):
+        dst.write(block)
+
+def encrypt_file(in_path, out_path, key, block_size=BLOCK_SIZE, workers=None):
+    with open(in_path, 'rb') as src, open(out_path, 'wb') as dst:
+        encrypt_stream(src, dst, key, block_size, workers)
+
+def decrypt_file(in_path, out_path, key, workers=None):
+    with open(in_path, 'rb') as src, open(out_path, 'wb') as dst:
+        decrypt_stream(src, dst, key, workers)
+
 def display_matrix(plaintext, key):
     num_cols = len(key)
     
@@ -70,25 +195,26 @@ def display_matrix(plaintext, key):
         print(row)
 
     
-plaintext = input("Enter the message to encrypt: ")
-key_str = input("Enter the key (numbers separated by spaces): ")
+if __name__ == '__main__':
+    plaintext = input("Enter the message to encrypt: ")
+    key_str = input("Enter the key (numbers separated by spaces): ")
     
-try:
-    key = [int(k) for k in key_str.split()]
+    try:
+        key = [int(k) for k in key_str.split()]
         
-    if not key or max(key) != len(key) or min(key) < 1 or len(set(key)) != len(key):
-        print("Invalid key. Key must be a permutation of numbers from 1 to n.")
+        if not key or max(key) != len(key) or min(key) < 1 or len(set(key)) != len(key):
+            print("Invalid key. Key must be a permutation of numbers from 1 to n.")
         
         
-    display_matrix(plaintext, key)
+        display_matrix(plaintext, key)
         
-    encrypted = encrypt(plaintext, key)
-    print(f"\nEncrypted message: {encrypted}")
+        encrypted = encrypt(plaintext, key)
+        print(f"\nEncrypted message: {encrypted}")
         
-    decrypted = decrypt(encrypted, key)
-    print(f"\nDecrypted message: {decrypted}")
-    print(f"Original message: {plaintext}")
+        decrypted = decrypt(encrypted, key)
+        print(f"\nDecrypted message: {decrypted}")
+        print(f"Original message: {plaintext}")
         
-except ValueError:
-    print("Invalid key format. Please enter numbers separated by spaces.")
+    except ValueError:
+        print("Invalid key format. Please enter numbers separated by spaces.")
 
@@ -0,0 +1,197 @@
+import os
+
+from SDES import SDES
+from SAES import SAES
+from streaming import CHUNK_SIZE, map_ordered, read_chunks
+
+# Streaming ECB / CBC / CTR for the toy block ciphers in SDES.py and SAES.py.
+# A cipher only needs block_size (in bytes), encrypt_block(int) and decrypt_block(int).
+
+CTR_CACHE = 4  # keystream periods kept per cipher object
+
+def xor_bytes(a, b):
+    return (int.from_bytes(a, 'big') ^ int.from_bytes(b, 'big')).to_bytes(len(a), 'big')
+
+def pad(data, block_size):
+    n = block_size - len(data) % block_size  # PKCS#7, always adds at least one byte
+    return data + bytes([n]) * n
+
+def unpad(data, block_size):
+    if not data or len(data) % block_size:
+        raise ValueError("Ciphertext length is not a multiple of the block size")
+    n = data[-1]
+    if n < 1 or n > block_size or data[-n:] != bytes([n]) * n:
+        raise ValueError("Invalid padding")
+    return data[:-n]
+
+def ecb(cipher, data, decrypt=False):
+    # SDES works on single bytes and has a translate table for the whole buffer
+    fast = getattr(cipher, 'decrypt_bytes' if decrypt else 'encrypt_bytes', None)
+    if fast is not None:
+        return fast(data)
+    block = cipher.decrypt_block if decrypt else cipher.encrypt_block
+    bs = cipher.block_size
+    out = bytearray(len(data))
+    for i in range(0, len(data), bs):
+        out[i:i + bs] = block(int.from_bytes(data[i:i + bs], 'big')).to_bytes(bs, 'big')
+    return bytes(out)
+
+def cbc_encrypt(cipher, data, prev):
+    bs = cipher.block_size
+    out = bytearray(len(data))
+    for i in range(0, len(data), bs):
+        prev = cipher.encrypt_block(int.from_bytes(data[i:i + bs], 'big') ^ prev)
+        out[i:i + bs] = prev.to_bytes(bs, 'big')
+    return bytes(out), prev
+
+def cbc_decrypt(cipher, data, prev):
+    bs = cipher.block_size
+    out = bytearray(len(data))
+    for i in range(0, len(data), bs):
+        c = int.from_bytes(data[i:i + bs], 'big')
+        out[i:i + bs] = (cipher.decrypt_block(c) ^ prev).to_bytes(bs, 'big')
+        prev = c
+    return bytes(out), prev
+
+def ctr_cycle(cipher, iv, build=True):
+    # The counter is one block wide, so the keystream repeats every 2^(8*block_size) blocks
+    # (256 bytes for SDES, 128 KB for SAES). The whole period is computed once and kept on the
+    # cipher object, so a cached key schedule keeps its keystreams too. With build=False a
+    # period that isn't cached yet comes back as None.
+    bs = cipher.block_size
+    period = 1 << (8 * bs)
+    cache = cipher.__dict__.setdefault('ctr_cycles', {})
+    cycle = cache.get(iv % period)
+    if cycle is None and build:
+        cycle = b''.join(cipher.encrypt_block((iv + i) % period).to_bytes(bs, 'big') for i in range(period))
+        if len(cache) >= CTR_CACHE:
+            cache.pop(next(iter(cache)), None)
+        cache[iv % period] = cycle
+    return cycle
+
+def ctr_keystream(cipher, iv, offset, length):
+    # only the counter blocks covering length bytes from a block aligned offset
+    bs = cipher.block_size
+    period = 1 << (8 * bs)
+    first = offset // bs
+    blocks = (length + bs - 1) // bs
+    return b''.join(cipher.encrypt_block((iv + first + i) % period).to_bytes(bs, 'big') for i in range(blocks))[:length]
+
+def ctr_xor(cycle, offset, data):
+    # offset is the byte position of data in the stream
+    start = offset % len(cycle)
+    reps = (start + len(data)) // len(cycle) + 1
+    keystream = (cycle * reps)[start:start + len(data)]
+    return xor_bytes(data, keystream)
+
+_worker_cycle = None
+
+def _init_worker(cycle):
+    global _worker_cycle
+    _worker_cycle = cycle
+
+def _ctr_task(args):
+    offset, data = args
+    return ctr_xor(_worker_cycle, offset, data)
+
+def ctr_stream(cipher, iv, src, dst, chunk_size=CHUNK_SIZE, workers=None):
+    # CTR encryption and decryption are the same operation
+    bs = cipher.block_size
+    chunk_size = max(bs, chunk_size - chunk_size % bs)  # whole blocks, at least one
+
+    if not workers or workers <= 1:
+        # short streams encrypt just the counters they use, the full period is only built
+        # once the stream is long enough to need all of it
+        period_bytes = bs << (8 * bs)
+        cycle = ctr_cycle(cipher, iv, build=False)
+        offset = 0
+        for chunk in read_chunks(src, chunk_size):
+            if cycle is None and offset + len(chunk) >= period_bytes:
+                cycle = ctr_cycle(cipher, iv)
+            if cycle is None:
+                dst.write(xor_bytes(chunk, ctr_keystream(cipher, iv, offset, len(chunk))))
+            else:
+                dst.write(ctr_xor(cycle, offset, chunk))
+            offset += len(chunk)
+        return
+
+    cycle = ctr_cycle(cipher, iv)
+
+    def tasks():
+        offset = 0
+        for chunk in read_chunks(src, chunk_size):
+            yield offset, chunk
+            offset += len(chunk)
+
+    for out in map_ordered(_ctr_task, tasks(), workers, _init_worker, (cycle,)):
+        dst.write(out)
+
+def encrypt_stream(cipher, mode, src, dst, iv=0, chunk_size=CHUNK_SIZE, workers=None):
+    bs = cipher.block_size
+    chunk_size = max(bs, chunk_size - chunk_size % bs)  # whole blocks, at least one
+    if mode == 'CTR':
+        return ctr_stream(cipher, iv, src, dst, chunk_size, workers)
+    if mode not in ('ECB', 'CBC'):
+        raise ValueError(f"Unknown mode: {mode}")
+
+    prev = iv
+    pending = b''
+    for chunk in read_chunks(src, chunk_size):
+        if pending:
+            if mode == 'ECB':
+                dst.write(ecb(cipher, pending))
+            else:
+                out, prev = cbc_encrypt(cipher, pending, prev)
+                dst.write(out)
+        pending = chunk
+    # only the last chunk gets padded
+    pending = pad(pending, bs)
+    if mode == 'ECB':
+        dst.write(ecb(cipher, pending))
+    else:
+        dst.write(cbc_encrypt(cipher, pending, prev)[0])
+
+def decrypt_stream(cipher, mode, src, dst, iv=0, chunk_size=CHUNK_SIZE, workers=None):
+    bs = cipher.block_size
+    chunk_size = max(bs, chunk_size - chunk_size % bs)  # whole blocks, at least one
+    if mode == 'CTR':
+        return ctr_stream(cipher, iv, src, dst, chunk_size, workers)
+    if mode not in ('ECB', 'CBC'):
+        raise ValueError(f"Unknown mode: {mode}")
+
+    prev = iv
+    pending = b''
+    for chunk in read_chunks(src, chunk_size):
+        if pending:
+            dst.write(pending)
+        if mode == 'ECB':
+            pending = ecb(cipher, chunk, decrypt=True)
+        else:
+            pending, prev = cbc_decrypt(cipher, chunk, prev)
+    # padding sits in the last chunk, hold it back until the stream ends
+    dst.write(unpad(pending, bs))
+
+def encrypt_file(cipher, mode, in_path, out_path, iv=0, chunk_size=CHUNK_SIZE, workers=None):
+    with open(in_path, 'rb') as src, open(out_path, 'wb') as dst:
+        encrypt_stream(cipher, mode, src, dst, iv, chunk_size, workers)
+
+def decrypt_file(cipher, mode, in_path, out_path, iv=0, chunk_size=CHUNK_SIZE, workers=None):
+    with open(in_path, 'rb') as src, open(out_path, 'wb') as dst:
+        decrypt_stream(cipher, mode, src, dst, iv, chunk_size, workers)
+
+if __name__ == '__main__':
+    name = input('Cipher (SDES/SAES): ').strip().upper()
+    mode = input('Mode (ECB/CBC/CTR): ').strip().upper()
+    key = input('Enter binary key: ').strip() # 10 bits for SDES, 16 bits for SAES
+    iv = int(input('Enter IV / nonce (decimal): ') or 0)
+    in_path = input('Input file: ')
+    out_path = input('Output file: ')
+    action = input('Encrypt or decrypt (e/d): ').strip().lower()
+
+    cipher = SDES(key) if name == 'SDES' else SAES(key)
+    workers = os.cpu_count() if mode == 'CTR' else None
+    if action == 'd':
+        decrypt_file(cipher, mode, in_path, out_path, iv, workers=workers)
+    else:
+        encrypt_file(cipher, mode, in_path, out_path, iv, workers=workers)
+    print(f"Wrote {os.path.getsize(out_path)} bytes to {out_path}")
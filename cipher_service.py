@@ -0,0 +1,154 @@
+import asyncio
+import io
+import json
+import os
+import random
+import time
+from functools import lru_cache
+
+import block_modes
+from SDES import SDES
+from SAES import SAES
+from Transposition import v1, v2
+
+# Asyncio encrypt/decrypt service for SDES, SAES and the two transposition ciphers.
+#
+# One JSON request per line, answered in order on the same connection, so a client can
+# pipeline as many requests as it likes without waiting:
+#   {"id": 1, "cipher": "SDES", "op": "encrypt", "key": "1010000010", "data": "<hex>", "mode": "CBC", "iv": 5}
+#   {"id": 2, "cipher": "v2", "op": "decrypt", "key": [3, 1, 2], "data": "text"}
+# Replies are {"id": 1, "result": ...} or {"id": 1, "error": "..."}.
+#
+# Expanded key schedules are kept in a bounded LRU cache, so clients that reuse keys
+# don't pay for generate_keys (and the lookup tables) on every request. The transposition
+# ciphers use the cached slice layouts of fast_encrypt/fast_decrypt, which keep every
+# character, including real X's that the original loops would drop as padding. The cipher work
+# itself runs in the loop's default thread pool, so a large SAES/CBC request doesn't
+# stall reads and writes on the other connections.
+
+CACHE_SIZE = 4096
+KEY_BITS = {'SDES': 10, 'SAES': 16}
+
+class CipherService:
+    def __init__(self, cache_size=CACHE_SIZE):
+        self.get_cipher = lru_cache(maxsize=cache_size)(self.make_cipher)
+
+    def make_cipher(self, name, key):
+        if name in KEY_BITS:
+            bits = KEY_BITS[name]
+            if not isinstance(key, str) or len(key) != bits or set(key) - {'0', '1'}:
+                raise ValueError(f"{name} key must be a {bits} bit binary string")
+            return SDES(key) if name == 'SDES' else SAES(key)
+        if name == 'v1':
+            if not isinstance(key, int) or isinstance(key, bool) or key < 1:
+                raise ValueError("v1 key must be a positive integer")
+            return (v1.fast_encrypt, v1.fast_decrypt, key)
+        if name == 'v2':
+            if (not isinstance(key, tuple) or not key or len(set(key)) != len(key)
+                    or not all(isinstance(k, int) and not isinstance(k, bool) for k in key)):
+                raise ValueError("v2 key must be a list of distinct integers")
+            # a tuple key goes straight into v2.column_layout's (length, key) cache
+            return (v2.fast_encrypt, v2.fast_decrypt, key)
+        raise ValueError(f"Unknown cipher: {name}")
+
+    def handle(self, request):
+        name, op = request['cipher'], request['op']
+        if op not in ('encrypt', 'decrypt'):
+            raise ValueError(f"Unknown op: {op}")
+        key = request['key']
+        cipher = self.get_cipher(name, tuple(key) if isinstance(key, list) else key)
+
+        if name in ('v1', 'v2'):
+            encrypt, decrypt, k = cipher
+            return (encrypt if op == 'encrypt' else decrypt)(request['data'], k)
+
+        stream = block_modes.encrypt_stream if op == 'encrypt' else block_modes.decrypt_stream
+        out = io.BytesIO()
+        stream(cipher, request.get('mode', 'ECB'), io.BytesIO(bytes.fromhex(request['data'])), out, request.get('iv', 0))
+        return out.getvalue().hex()
+
+    async def serve_client(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = None
+                try:
+                    request = json.loads(line)
+                    reply = {'id': request.get('id'), 'result': await loop.run_in_executor(None, self.handle, request)}
+                except Exception as e:
+                    # a bad request gets an error reply, the requests pipelined behind it still run
+                    reply = {'id': request.get('id') if isinstance(request, dict) else None, 'error': str(e)}
+                writer.write(json.dumps(reply).encode() + b'\n')
+                # only wait for the socket when the write buffer backs up
+                if writer.transport.get_write_buffer_size() > 1 << 16:
+                    await writer.drain()
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=8765, path=None):
+        if path:
+            return await asyncio.start_unix_server(self.serve_client, path=path)
+        return await asyncio.start_server(self.serve_client, host, port)
+
+async def open_client(host='127.0.0.1', port=8765, path=None):
+    if path:
+        return await asyncio.open_unix_connection(path)
+    return await asyncio.open_connection(host, port)
+
+async def run_client(requests, host='127.0.0.1', port=8765, path=None):
+    # send everything first, then read the replies back in order
+    reader, writer = await open_client(host, port, path)
+    writer.writelines(json.dumps(r).encode() + b'\n' for r in requests)
+    await writer.drain()
+    replies = [json.loads(await reader.readline()) for _ in requests]
+    writer.close()
+    await writer.wait_closed()
+    return replies
+
+def random_request(i, keys):
+    cipher = random.choice(['SDES', 'SAES', 'v1', 'v2'])
+    if cipher in ('SDES', 'SAES'):
+        return {'id': i, 'cipher': cipher, 'op': 'encrypt', 'key': random.choice(keys[cipher]),
+                'data': os.urandom(64).hex(), 'mode': 'CBC', 'iv': 1}
+    key = random.randint(2, 8) if cipher == 'v1' else random.sample(range(1, 6), 5)
+    return {'id': i, 'cipher': cipher, 'op': 'encrypt', 'key': key, 'data': 'attack at dawn ' * 4}
+
+async def benchmark(clients=200, requests_per_client=50, distinct_keys=32, cache_size=CACHE_SIZE, path=None):
+    service = CipherService(cache_size)
+    server = await service.start(port=0, path=path)
+    port = None if path else server.sockets[0].getsockname()[1]
+    keys = {
+        'SDES': [format(random.getrandbits(10), '010b') for _ in range(distinct_keys)],
+        'SAES': [format(random.getrandbits(16), '016b') for _ in range(distinct_keys)],
+    }
+    batches = [[random_request(i, keys) for i in range(requests_per_client)] for _ in range(clients)]
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(run_client(batch, port=port, path=path) for batch in batches))
+    seconds = time.perf_counter() - start
+    server.close()
+    await server.wait_closed()
+
+    total = clients * requests_per_client
+    errors = sum('error' in reply for replies in results for reply in replies)
+    print(f"{clients} clients x {requests_per_client} requests in {seconds:.3f} s: {total / seconds:,.0f} requests/s")
+    print(f"Errors: {errors}")
+    print(f"Key cache: {service.get_cipher.cache_info()}")
+
+if __name__ == '__main__':
+    choice = input('Run server or benchmark (s/b): ').strip().lower()
+    if choice == 's':
+        async def main():
+            server = await CipherService().start()
+            print("Listening on", server.sockets[0].getsockname())
+            async with server:
+                await server.serve_forever()
+        asyncio.run(main())
+    else:
+        asyncio.run(benchmark())
@@ -0,0 +1,179 @@
+import asyncio
+import hashlib
+import importlib
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List
+
+dh = importlib.import_module('Diffie-Hellman')
+
+# How many DiffieHellman handshakes per second can one machine sustain?
+#
+# Pairwise mode runs N exchanges over local TCP connections, at most `concurrency` at a time:
+#   client -> server: client public key (hex line)
+#   server -> client: server public key
+#   client -> server: sha256 of the derived session key, server answers OK if it matches
+# Group mode is tree-based group DH over N members: every node has a secret k and a blinded
+# key g^k. An internal node is a DH exchange of its children's blinded keys, each side raising
+# the other's blinded key to its own secret, and the result becomes the node secret, so the root
+# secret is shared by everyone after log2(N) rounds. Only blinded keys cross the wire.
+# Modular exponentiation can be moved to a process pool so the event loop only does I/O.
+
+@dataclass
+class Report:
+    exchanges: int
+    seconds: float
+    latencies: List[float] = field(default_factory=list)
+
+    @property
+    def per_second(self) -> float:
+        return self.exchanges / self.seconds
+
+    def percentile(self, q):
+        if not self.latencies:
+            return float('nan')
+        return statistics.quantiles(self.latencies, n=100, method='inclusive')[q - 1] if len(self.latencies) > 1 else self.latencies[0]
+
+    def __str__(self):
+        return (f"{self.exchanges} exchanges in {self.seconds:.3f} s ({self.per_second:,.1f}/s), latency "
+                f"p50 {self.percentile(50) * 1000:.2f} ms, p90 {self.percentile(90) * 1000:.2f} ms, "
+                f"p99 {self.percentile(99) * 1000:.2f} ms")
+
+_worker_params = None
+
+def _init_worker(p, g, group):
+    global _worker_params
+    _worker_params = (p, g, group)
+
+def _new_party(private_key=None):
+    p, g, group = _worker_params
+    party = dh.DiffieHellman(p, g, group, private_key)
+    return party.private_key, party.public_key
+
+def _session_key(private_key, other_public_key):
+    p, g, group = _worker_params
+    return dh.DiffieHellman(p, g, private_key=private_key, group=group).session_key(other_public_key)
+
+class ExchangeBenchmark:
+    def __init__(self, p, g, use_group=True, workers=None):
+        self.p = p
+        self.g = g
+        group = dh.FixedBaseGroup(p, g) if use_group else None
+        _init_worker(p, g, group)
+        self.pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(p, g, group)) if workers else None
+
+    async def call(self, fn, *args):
+        if self.pool is None:
+            return fn(*args)
+        return await asyncio.get_running_loop().run_in_executor(self.pool, fn, *args)
+
+    async def serve(self, reader, writer, private_key=None):
+        # server side of one handshake per connection
+        try:
+            line = await reader.readline()
+            private_key, public_key = await self.call(_new_party, private_key)
+            writer.write(format(public_key, 'x').encode() + b'\n')
+            key = await self.call(_session_key, private_key, int(line, 16))
+            confirm = await reader.readline()
+            ok = bytes.fromhex(confirm.decode().strip()) == hashlib.sha256(key).digest()
+            writer.write(b'OK\n' if ok else b'FAIL\n')
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def exchange(self, reader, writer, private_key=None):
+        # client side of one handshake, returns the session key
+        private_key, public_key = await self.call(_new_party, private_key)
+        writer.write(format(public_key, 'x').encode() + b'\n')
+        await writer.drain()
+        other = int(await reader.readline(), 16)
+        key = await self.call(_session_key, private_key, other)
+        writer.write(hashlib.sha256(key).hexdigest().encode() + b'\n')
+        await writer.drain()
+        if await reader.readline() != b'OK\n':
+            raise RuntimeError("Session keys don't match")
+        return key
+
+    async def run_pairwise(self, n, concurrency=100):
+        server = await asyncio.start_server(self.serve, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        latencies = []
+        limit = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with limit:
+                start = time.perf_counter()
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                await self.exchange(reader, writer)
+                writer.close()
+                await writer.wait_closed()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(n)))
+        seconds = time.perf_counter() - start
+        server.close()
+        await server.wait_closed()
+        return Report(n, seconds, latencies)
+
+    async def run_group(self, n):
+        if n < 1:
+            raise ValueError("A group needs at least one member")
+        # every member starts as a leaf with its own (secret, blinded key)
+        server = await asyncio.start_server(self.serve_node, '127.0.0.1', 0)
+        self.node_port = server.sockets[0].getsockname()[1]
+        nodes = [await self.call(_new_party) for _ in range(n)]
+        # what the members of each subtree know locally: its secret, looked up by blinded key
+        self.node_secrets = {blinded: secret for secret, blinded in nodes}
+        latencies = []
+        start = time.perf_counter()
+        while len(nodes) > 1:
+            round_start = time.perf_counter()
+            pairs = [nodes[i:i + 2] for i in range(0, len(nodes), 2)]
+            nodes = await asyncio.gather(*(self.join(pair) for pair in pairs))
+            latencies.append(time.perf_counter() - round_start)
+        seconds = time.perf_counter() - start
+        server.close()
+        await server.wait_closed()
+        self.group_key = hashlib.sha256(nodes[0][0].to_bytes((self.p.bit_length() + 7) // 8, 'big')).digest()
+        return Report(n - 1, seconds, latencies)
+
+    async def serve_node(self, reader, writer):
+        # the server plays the right child, named by its blinded key, with the secret its
+        # members already hold; then the usual handshake of blinded keys
+        right = int(await reader.readline(), 16)
+        await self.serve(reader, writer, self.node_secrets[right])
+
+    async def join(self, pair):
+        if len(pair) == 1:
+            return pair[0]
+        left, right = pair
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.node_port)
+        writer.write(format(right[1], 'x').encode() + b'\n')
+        key = await self.exchange(reader, writer, left[0])
+        writer.close()
+        await writer.wait_closed()
+        # the parent's secret is derived from the pair's shared session key, its blinded key
+        # is what the next level exchanges
+        parent = await self.call(_new_party, int.from_bytes(key, 'big') % (self.p - 3) + 2)
+        self.node_secrets[parent[1]] = parent[0]
+        return parent
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+if __name__ == '__main__':
+    bits = int(input('Group size in bits: ') or 1024)
+    n = int(input('Number of exchanges: ') or 1000)
+    workers = int(input('Process pool workers (0 for none): ') or 0)
+
+    p, g = dh.get_group(bits, workers=os.cpu_count())
+    bench = ExchangeBenchmark(p, g, workers=workers or None)
+    print("Pairwise:", asyncio.run(bench.run_pairwise(n)))
+    report = asyncio.run(bench.run_group(n))
+    print(f"Group of {n}: {len(report.latencies)} rounds in {report.seconds:.3f} s, key {bench.group_key.hex()[:16]}...")
+    bench.close()
@@ -0,0 +1,82 @@
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from RSA import RSA, search_prime
+
+# Bulk RSA key pairs for test fixtures.
+#
+# With a fixed prime e, d = e^-1 mod phi can be written as d = (1 + k*phi) / e with
+# k = -phi^-1 mod e. Every key then needs an inverse modulo the same small number e, so all
+# of them come from one modular inversion with Montgomery's trick (plus 3(n-1) multiplications)
+# instead of one extended Euclid per key.
+
+MAGIC = b'RSAK'
+HEADER = struct.Struct('>4sBIIH')  # magic, version, e, count, bytes per prime
+
+def batch_inverse(values, m):
+    # prefix[i] = values[0] * ... * values[i-1] mod m
+    prefix = [1]
+    for v in values:
+        prefix.append(prefix[-1] * v % m)
+    inv = pow(prefix[-1], -1, m)
+    result = [0] * len(values)
+    for i in range(len(values) - 1, -1, -1):
+        result[i] = prefix[i] * inv % m
+        inv = inv * values[i] % m
+    return result
+
+def private_exponents(e, phis):
+    inverses = batch_inverse([phi % e for phi in phis], e)
+    return [(1 + (-inv % e) * phi) // e for inv, phi in zip(inverses, phis)]
+
+def generate_key_pairs(count, bits=512, e=65537, workers=None):
+    prime_bits = bits // 2
+    if workers and workers > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            primes = list(pool.map(search_prime, [prime_bits] * (2 * count), [e] * (2 * count), chunksize=16))
+    else:
+        primes = [search_prime(prime_bits, e) for _ in range(2 * count)]
+    pairs = []
+    for p, q in zip(primes[::2], primes[1::2]):
+        while p == q:
+            q = search_prime(prime_bits, e)
+        pairs.append((p, q))
+    ds = private_exponents(e, [(p - 1) * (q - 1) for p, q in pairs])
+    return [RSA(p, q, e=e, d=d) for (p, q), d in zip(pairs, ds)]
+
+def write_keystore(path, keys):
+    # fixed width records of p, q and d; n, phi and the CRT values are rebuilt on load
+    # an empty batch is just a header; d < p*q, so it fits in twice the prime width
+    e = keys[0].e if keys else 0
+    width = (max((max(k.p.bit_length(), k.q.bit_length()) for k in keys), default=0) + 7) // 8
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, 1, e, len(keys), width))
+        for k in keys:
+            if k.e != e:
+                raise ValueError("All keys in a keystore must share e")
+            f.write(k.p.to_bytes(width, 'big') + k.q.to_bytes(width, 'big') + k.d.to_bytes(2 * width, 'big'))
+
+def read_keystore(path):
+    with open(path, 'rb') as f:
+        magic, version, e, count, width = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != 1:
+            raise ValueError(f"{path} is not a keystore")
+        keys = []
+        for _ in range(count):
+            record = f.read(4 * width)
+            p = int.from_bytes(record[:width], 'big')
+            q = int.from_bytes(record[width:2 * width], 'big')
+            keys.append(RSA(p, q, e=e, d=int.from_bytes(record[2 * width:], 'big')))
+        return keys
+
+if __name__ == '__main__':
+    count = int(input('Number of key pairs: '))
+    bits = int(input('Key size in bits: ') or 512)
+    path = input('Keystore file: ')
+
+    start = time.perf_counter()
+    keys = generate_key_pairs(count, bits, workers=os.cpu_count())
+    write_keystore(path, keys)
+    print(f"Wrote {count} keys ({os.path.getsize(path)} bytes) in {time.perf_counter() - start:.2f} s")
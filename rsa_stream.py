@@ -0,0 +1,114 @@
+import os
+import secrets
+
+from RSA import RSA
+from streaming import map_ordered, read_chunks
+
+# Encrypt / decrypt arbitrary byte streams with RSA. The input is cut into blocks that fit
+# the modulus, each block gets PKCS#1 v1.5 (type 2) padding and becomes one k byte
+# ciphertext block, where k is the byte length of n. Blocks are independent, so batches of
+# them go to a process pool (pow holds the GIL, threads would not help) and results come
+# back in order with a bounded number of batches in flight.
+
+BATCH_BLOCKS = 64
+
+def modulus_bytes(n):
+    return (n.bit_length() + 7) // 8
+
+def plaintext_block_size(n):
+    # 11 bytes of every block go to padding, at least one has to be left for data
+    k = modulus_bytes(n)
+    if k < 12:
+        raise ValueError("modulus too small for PKCS#1 v1.5")
+    return k - 11
+
+def pad_block(data, k):
+    # 00 02 <non-zero random bytes> 00 <data>
+    ps_len = k - 3 - len(data)
+    if ps_len < 8:
+        raise ValueError("Block too long for the modulus")
+    ps = bytearray()
+    while len(ps) < ps_len:
+        ps.extend(b for b in secrets.token_bytes(ps_len - len(ps)) if b)
+    return b'\x00\x02' + bytes(ps) + b'\x00' + data
+
+def unpad_block(block):
+    sep = block.find(b'\x00', 2)
+    if block[:2] != b'\x00\x02' or sep < 10:
+        raise ValueError("Invalid padding")
+    return block[sep + 1:]
+
+def encrypt_blocks(public_key, blocks):
+    e, n = public_key
+    k = modulus_bytes(n)
+    return b''.join(pow(int.from_bytes(pad_block(b, k), 'big'), e, n).to_bytes(k, 'big') for b in blocks)
+
+def decrypt_blocks(rsa, blocks):
+    k = modulus_bytes(rsa.n)
+    plain = rsa.decrypt_many(int.from_bytes(b, 'big') for b in blocks)
+    return b''.join(unpad_block(m.to_bytes(k, 'big')) for m in plain)
+
+_worker_key = None
+
+def _init_worker(key):
+    global _worker_key
+    _worker_key = key
+
+def _encrypt_task(blocks):
+    return encrypt_blocks(_worker_key, blocks)
+
+def _decrypt_task(blocks):
+    return decrypt_blocks(_worker_key, blocks)
+
+def split(chunks, block_size, exact=False):
+    # regroup chunks of any size into lists of BATCH_BLOCKS whole blocks, with exact=True
+    # a trailing partial block is an error instead of a short last block
+    batch = []
+    rest = b''
+    for chunk in chunks:
+        if rest:
+            chunk = rest + chunk
+        end = len(chunk) - len(chunk) % block_size
+        for i in range(0, end, block_size):
+            batch.append(chunk[i:i + block_size])
+            if len(batch) == BATCH_BLOCKS:
+                yield batch
+                batch = []
+        rest = chunk[end:]
+    if rest:
+        if exact:
+            raise ValueError("Ciphertext length is not a multiple of the modulus size")
+        batch.append(rest)
+    if batch:
+        yield batch
+
+def encrypt_stream(public_key, chunks, workers=None):
+    block_size = plaintext_block_size(public_key[1])
+    yield from map_ordered(_encrypt_task, split(chunks, block_size), workers, _init_worker, (public_key,))
+
+def decrypt_stream(rsa, chunks, workers=None):
+    batches = split(chunks, modulus_bytes(rsa.n), exact=True)
+    yield from map_ordered(_decrypt_task, batches, workers, _init_worker, (rsa,))
+
+def encrypt_file(public_key, in_path, out_path, workers=None):
+    block_size = plaintext_block_size(public_key[1])
+    with open(in_path, 'rb') as src, open(out_path, 'wb') as dst:
+        chunk_size = block_size * BATCH_BLOCKS * 16
+        for out in encrypt_stream(public_key, read_chunks(src, chunk_size), workers):
+            dst.write(out)
+
+def decrypt_file(rsa, in_path, out_path, workers=None):
+    k = modulus_bytes(rsa.n)
+    with open(in_path, 'rb') as src, open(out_path, 'wb') as dst:
+        for out in decrypt_stream(rsa, read_chunks(src, k * BATCH_BLOCKS * 16), workers):
+            dst.write(out)
+
+if __name__ == '__main__':
+    bits = int(input('Key size in bits: ') or 2048)
+    in_path = input('File to encrypt: ')
+
+    rsa = RSA.generate(bits)
+    workers = os.cpu_count()
+    encrypt_file(rsa.public_key, in_path, in_path + '.rsa', workers)
+    decrypt_file(rsa, in_path + '.rsa', in_path + '.dec', workers)
+    print(f"Encrypted to {in_path}.rsa, decrypted to {in_path}.dec")
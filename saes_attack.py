@@ -0,0 +1,135 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+
+from SAES import SAES
+
+# Key recovery against SAES and double SAES (C = E_k2(E_k1(P))) from known plaintext.
+# Key schedules for a whole range of keys are expanded with array operations and every
+# candidate key is tested at once through the lookup tables of the SAES integer engine.
+
+_ref = SAES('0' * 16)  # builds SAES.tables, the key itself is not used
+_t = {name: np.array(table, dtype=np.uint16) for name, table in SAES.tables.items()}
+_sub_byte = np.array([(_t['sbox'][b >> 4] << 4) | _t['sbox'][b & 0xF] for b in range(256)], dtype=np.uint16)
+_inv_mix_hi = np.array([_ref.mix_columns_int(b << 8, _ref.inv_mix_column_matrix) for b in range(256)], dtype=np.uint16)
+_inv_mix_lo = np.array([_ref.mix_columns_int(b, _ref.inv_mix_column_matrix) for b in range(256)], dtype=np.uint16)
+RCON = [None, 0x80, 0x30]
+
+@dataclass
+class AttackResult:
+    keys: List[Tuple[int, ...]]
+    keys_tested: int
+    seconds: float
+    workers: int = 1
+
+    @property
+    def keys_per_second(self) -> float:
+        return self.keys_tested / self.seconds if self.seconds else float('inf')
+
+    @property
+    def keys_per_second_per_core(self) -> float:
+        return self.keys_per_second / self.workers
+
+def key_schedules(start=0, stop=1 << 16):
+    # same as SAES.generate_keys, for every key in [start, stop)
+    keys = np.arange(start, stop, dtype=np.uint32).astype(np.uint16)
+    w0, w1 = keys >> 8, keys & 0xFF
+    w2 = w0 ^ RCON[1] ^ _sub_byte[((w1 << 4) | (w1 >> 4)) & 0xFF]
+    w3 = w2 ^ w1
+    w4 = w2 ^ RCON[2] ^ _sub_byte[((w3 << 4) | (w3 >> 4)) & 0xFF]
+    w5 = w4 ^ w3
+    k1 = (w2 << 8) | w3
+    inv_k1 = _inv_mix_hi[k1 >> 8] ^ _inv_mix_lo[k1 & 0xFF]
+    return keys, (w0 << 8) | w1, k1, (w4 << 8) | w5, inv_k1
+
+def encrypt_with(blocks, k0, k1, k2):
+    # blocks and keys broadcast against each other
+    state = blocks ^ k0
+    state = _t['enc_hi'][state >> 8] ^ _t['enc_lo'][state & 0xFF] ^ k1
+    return _t['enc_last_hi'][state >> 8] ^ _t['enc_last_lo'][state & 0xFF] ^ k2
+
+def decrypt_with(blocks, k0, inv_k1, k2):
+    state = blocks ^ k2
+    state = _t['dec_hi'][state >> 8] ^ _t['dec_lo'][state & 0xFF] ^ inv_k1
+    return _t['dec_last_hi'][state >> 8] ^ _t['dec_last_lo'][state & 0xFF] ^ k0
+
+def search_range(pairs, start, stop):
+    keys, k0, k1, k2, _ = key_schedules(start, stop)
+    for p, c in pairs:
+        match = encrypt_with(np.uint16(p), k0, k1, k2) == c
+        keys, k0, k1, k2 = keys[match], k0[match], k1[match], k2[match]
+        if len(keys) == 0:
+            break
+    return [int(k) for k in keys]
+
+def _search_task(args):
+    return search_range(*args)
+
+def recover_key(pairs, workers=None):
+    # pairs: list of (plaintext, ciphertext) 16 bit integers
+    workers = workers or os.cpu_count()
+    start = time.perf_counter()
+    if workers == 1:
+        keys = search_range(pairs, 0, 1 << 16)
+    else:
+        step = (1 << 16) // workers
+        ranges = [(pairs, i * step, (i + 1) * step if i < workers - 1 else 1 << 16) for i in range(workers)]
+        with ProcessPoolExecutor(workers) as pool:
+            keys = [k for part in pool.map(_search_task, ranges) for k in part]
+    return AttackResult([(k,) for k in keys], 1 << 16, time.perf_counter() - start, workers)
+
+def meet_in_the_middle(pairs):
+    # E_k1(P) for every k1 meets D_k2(C) for every k2 on the first pair;
+    # the ~2^16 surviving (k1, k2) combinations are then checked against the other pairs
+    start = time.perf_counter()
+    keys, k0, k1, k2, inv_k1 = key_schedules()
+    p, c = pairs[0]
+    forward = encrypt_with(np.uint16(p), k0, k1, k2)
+    backward = decrypt_with(np.uint16(c), k0, inv_k1, k2)
+
+    order = np.argsort(forward, kind='stable')
+    sorted_forward = forward[order]
+    left = np.searchsorted(sorted_forward, backward, 'left')
+    counts = np.searchsorted(sorted_forward, backward, 'right') - left
+    second = np.repeat(keys, counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    first = order[np.repeat(left, counts) + offsets]
+
+    for p, c in pairs[1:]:
+        middle = encrypt_with(np.uint16(p), k0[first], k1[first], k2[first])
+        match = encrypt_with(middle, k0[second], k1[second], k2[second]) == c
+        first, second = first[match], second[match]
+    found = [(int(a), int(b)) for a, b in zip(first, second)]
+    # 2 * 2^16 single encryptions stand in for 2^32 double encryptions
+    return AttackResult(found, 1 << 32, time.perf_counter() - start)
+
+def benchmark(pairs, max_workers=None):
+    max_workers = max_workers or os.cpu_count()
+    workers = 1
+    while workers <= max_workers:
+        result = recover_key(pairs, workers)
+        print(f"{workers} worker(s): {result.seconds:.4f} s, "
+              f"{result.keys_per_second:,.0f} keys/s, {result.keys_per_second_per_core:,.0f} keys/s per core")
+        workers *= 2
+
+if __name__ == '__main__':
+    key = int(input('Enter 16 bit key: '), 2)
+    second_key = int(input('Enter second 16 bit key for double SAES: '), 2)
+    n = int(input('Number of known plaintext blocks: '))
+
+    plaintexts = [int(x) for x in np.random.randint(0, 1 << 16, n)]
+    first, second = SAES(format(key, '016b')), SAES(format(second_key, '016b'))
+
+    pairs = [(p, first.encrypt_int(p)) for p in plaintexts]
+    result = recover_key(pairs)
+    print("SAES keys:", [format(k, '016b') for (k,) in result.keys])
+    benchmark(pairs)
+
+    double_pairs = [(p, second.encrypt_int(first.encrypt_int(p))) for p in plaintexts]
+    result = meet_in_the_middle(double_pairs)
+    print("Double SAES key pairs:", [(format(a, '016b'), format(b, '016b')) for a, b in result.keys])
+    print(f"Meet in the middle: {result.seconds:.4f} s, {result.keys_per_second:,.0f} key pairs/s")
@@ -0,0 +1,105 @@
+import time
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+from SDES import SDES
+
+# Known-plaintext attack on SDES: try all 1024 keys against many (plaintext, ciphertext)
+# byte pairs at once. The encryption of every byte under every key is a 1024 x 256 uint8
+# table, built with array operations instead of 1024 SDES objects.
+
+_ref = SDES('0' * 10)  # only used for its permutation tables and S-boxes
+
+@dataclass
+class KeySearchResult:
+    keys: List[str]
+    pairs_checked: int
+    evaluations: int  # keys x blocks actually compared
+    seconds: float
+
+    @property
+    def throughput(self) -> float:
+        return self.evaluations / self.seconds if self.seconds else float('inf')
+
+def permute_array(values, pattern, width):
+    result = np.zeros_like(values)
+    for i in pattern:
+        result = (result << 1) | ((values >> (width - 1 - i)) & 1)
+    return result
+
+def rotl5(values, n):
+    return ((values << n) | (values >> (5 - n))) & 0x1F
+
+def all_subkeys():
+    keys = np.arange(1024, dtype=np.uint16)
+    p10 = permute_array(keys, _ref.P10, 10)
+    left1, right1 = rotl5(p10 >> 5, 1), rotl5(p10 & 0x1F, 1)
+    k1 = permute_array((left1 << 5) | right1, _ref.P8, 10)
+    left2, right2 = rotl5(left1, 2), rotl5(right1, 2)
+    k2 = permute_array((left2 << 5) | right2, _ref.P8, 10)
+    return k1.astype(np.uint8), k2.astype(np.uint8)
+
+def F_array(R, K, s0, s1):
+    xored = permute_array(R, _ref.EP, 4) ^ K
+    left, right = xored >> 4, xored & 0xF
+    # row is bits 0 and 3, col is bits 1 and 2 (same as SDES.substitute)
+    s0_out = s0[((left >> 2) & 2) | (left & 1), (left >> 1) & 3]
+    s1_out = s1[((right >> 2) & 2) | (right & 1), (right >> 1) & 3]
+    return permute_array((s0_out << 2) | s1_out, _ref.P4, 4)
+
+def feistel_array(blocks, k_first, k_second):
+    s0, s1 = np.array(_ref.S0, dtype=np.uint8), np.array(_ref.S1, dtype=np.uint8)
+    ip = permute_array(blocks, _ref.IP, 8)
+    L, R = ip >> 4, ip & 0xF
+    L = L ^ F_array(R, k_first, s0, s1)
+    L, R = R, L # swapped
+    L = L ^ F_array(R, k_second, s0, s1)
+    return permute_array((L << 4) | R, _ref.IP_inv, 8)
+
+def encryption_tables():
+    # row k is the encryption table for key k
+    k1, k2 = all_subkeys()
+    blocks = np.arange(256, dtype=np.uint8)[None, :]
+    return feistel_array(blocks, k1[:, None], k2[:, None]).astype(np.uint8)
+
+def recover_keys(plaintexts, ciphertexts, batch_size=64, tables=None):
+    plaintexts = np.frombuffer(bytes(plaintexts), dtype=np.uint8)
+    ciphertexts = np.frombuffer(bytes(ciphertexts), dtype=np.uint8)
+    if len(plaintexts) != len(ciphertexts):
+        raise ValueError("Need the same number of plaintext and ciphertext blocks")
+
+    start = time.perf_counter()
+    if tables is None:
+        tables = encryption_tables()
+    candidates = np.arange(1024)
+    evaluations = 0
+    checked = 0
+    # every batch of pairs shrinks the candidate set, so later batches cost less
+    for i in range(0, len(plaintexts), batch_size):
+        if len(candidates) == 0:
+            break
+        p = plaintexts[i:i + batch_size]
+        c = ciphertexts[i:i + batch_size]
+        match = (tables[candidates][:, p] == c).all(axis=1)
+        evaluations += len(candidates) * len(p)
+        checked += len(p)
+        candidates = candidates[match]
+    seconds = time.perf_counter() - start
+
+    keys = [format(int(k), '010b') for k in candidates]
+    return KeySearchResult(keys, checked, evaluations, seconds)
+
+if __name__ == '__main__':
+    key = input('Enter 10 bit key to recover: ')
+    n = int(input('Number of known plaintext bytes: '))
+
+    plaintexts = np.random.randint(0, 256, n, dtype=np.uint8).tobytes()
+    ciphertexts = SDES(key).encrypt_bytes(plaintexts)
+
+    result = recover_keys(plaintexts, ciphertexts)
+    print("Candidate keys:", result.keys)
+    print(f"Pairs checked: {result.pairs_checked}")
+    print(f"Time: {result.seconds:.4f} s")
+    print(f"Throughput: {result.throughput:,.0f} keys x blocks / s")
@@ -0,0 +1,44 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Helpers shared by the streaming code (block_modes, rsa_stream, Transposition/v2 and the
+# A Star batch solver): filled reads from files and sockets, and an ordered, bounded
+# process-pool map.
+
+CHUNK_SIZE = 1 << 20  # 1 MB per read
+
+def read_chunks(src, chunk_size=CHUNK_SIZE):
+    # files and socket makefile() objects may return short reads, so fill each chunk
+    while True:
+        chunk = src.read(chunk_size)
+        if not chunk:
+            return
+        while len(chunk) < chunk_size:
+            more = src.read(chunk_size - len(chunk))
+            if not more:
+                break
+            chunk += more
+        yield chunk
+
+def map_ordered(fn, items, workers=None, initializer=None, initargs=()):
+    # fn(item) for every item, yielded in input order. With workers > 1 the calls run on a
+    # process pool with at most 2 items per worker in flight, so memory stays bounded however
+    # long the input is. The initializer also runs in this process for the serial path.
+    if not workers or workers <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for item in items:
+            yield fn(item)
+        return
+    with ProcessPoolExecutor(workers, initializer=initializer, initargs=initargs) as pool:
+        pending = deque()
+        try:
+            for item in items:
+                pending.append(pool.submit(fn, item))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()